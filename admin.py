@@ -7,14 +7,37 @@ from __future__ import annotations
 
 from sqladmin import Admin, ModelView
 from sqladmin.authentication import AuthenticationBackend
+from sqladmin.helpers import object_identifier_values
 from starlette.requests import Request
 
-from core.security import hash_password, verify_password
+from core.cache import user_cache
+from core.catalog import invalidate_catalog
+from core.enrollment_counts import (
+    adjust_enrollment_count,
+    decrement_for_user,
+)
+from core.export import export_response
+from core.search import (
+    course_search_filter,
+    search_terms,
+    trigram_terms,
+    user_search_filter,
+)
+from core.security import (
+    HashingPoolSaturated,
+    hash_password_async,
+    verify_password_async,
+)
 from config import settings
-from database import AsyncSessionLocal
+from database import ReadSessionLocal, engine
 from models import User, Course, Enrollment
 
-from sqlalchemy import select
+from sqlalchemy import Select, asc, delete, desc, false, func, or_, select
+from sqlalchemy.orm import joinedload
+from sqlalchemy.ext.asyncio import async_object_session
+
+# Largest value an integer primary key can hold (SQLite INTEGER / BIGINT)
+MAX_ID = 2**63 - 1
 
 
 # ── Authentication Backend ──────────────────────────────────────────────
@@ -32,13 +55,20 @@ class AdminAuth(AuthenticationBackend):
         username = form.get("username", "")
         password = form.get("password", "")
 
-        async with AsyncSessionLocal() as session:
+        async with ReadSessionLocal() as session:
             result = await session.execute(
                 select(User).where(User.username == username)
             )
             user = result.scalar_one_or_none()
 
-        if user is None or not verify_password(password, user.hashed_password):
+        if user is None:
+            return False
+
+        try:
+            if not await verify_password_async(password, user.hashed_password):
+                return False
+        except HashingPoolSaturated:
+            # Under a login burst, refuse rather than queue unboundedly
             return False
 
         # Store minimal info in session
@@ -53,10 +83,34 @@ class AdminAuth(AuthenticationBackend):
         return bool(request.session.get("admin_user_id"))
 
 
+# ── Helpers ─────────────────────────────────────────────────────────────
+
+
+async def delete_enrollments(model, condition) -> None:
+    """Bulk-delete enrollments in the same transaction that deletes `model`."""
+    session = async_object_session(model)
+    if session is not None:
+        await session.execute(delete(Enrollment).where(condition))
+
+
+class StreamingExportMixin:
+    """
+    Serve the admin CSV/JSON export buttons from core.export instead of
+    SQLAdmin's default, which loads every row before writing the file.
+    """
+
+    async def get_model_objects(self, request: Request, limit: int | None = 0) -> list:
+        # Rows are streamed by export_data; nothing to materialize here
+        return []
+
+    async def export_data(self, data: list, export_type: str = "csv", request: Request | None = None):
+        return export_response(self.model, self._export_prop_names, export_type, self.name)
+
+
 # ── Model Views ─────────────────────────────────────────────────────────
 
 
-class UserAdmin(ModelView, model=User):
+class UserAdmin(StreamingExportMixin, ModelView, model=User):
     name = "User"
     name_plural = "Users"
     icon = "fa-solid fa-user"
@@ -89,7 +143,7 @@ class UserAdmin(ModelView, model=User):
         User.created_at,
     ]
     export_types = ["csv", "json"]
-    export_max_rows = 0  # unlimited
+    export_max_rows = 0  # unlimited, streamed in batches
 
     # Forms — never expose hashed_password directly
     form_excluded_columns = [
@@ -117,16 +171,35 @@ class UserAdmin(ModelView, model=User):
         User.updated_at: "Updated",
     }
 
+    def search_query(self, stmt: Select, term: str) -> Select:
+        """Serve the search box from the trigram index instead of four LIKE scans."""
+        terms = trigram_terms(term)
+        if not terms:
+            # Too short for trigrams; fall back to the LIKE search
+            return super().search_query(stmt, term)
+        return stmt.where(user_search_filter(engine.dialect.name, terms))
+
     async def on_model_change(self, data: dict, model: User, is_created: bool, request: Request) -> None:
         """Hash the password when creating / editing a user through the admin panel."""
         if "password" in data and data["password"]:
-            model.hashed_password = hash_password(data["password"])
+            model.hashed_password = await hash_password_async(data["password"])
         elif is_created:
             # Creating a user without a password — set a random unusable one
-            model.hashed_password = hash_password("changeme")
+            model.hashed_password = await hash_password_async("changeme")
+
+    async def after_model_change(self, data: dict, model: User, is_created: bool, request: Request) -> None:
+        """Drop the cached copy so AuthMiddleware picks up the edit."""
+        user_cache.pop(model.id)
 
+    async def on_model_delete(self, model: User, request: Request) -> None:
+        await decrement_for_user(async_object_session(model), model.id)
+        await delete_enrollments(model, Enrollment.user_id == model.id)
 
-class CourseAdmin(ModelView, model=Course):
+    async def after_model_delete(self, model: User, request: Request) -> None:
+        user_cache.pop(model.id)
+
+
+class CourseAdmin(StreamingExportMixin, ModelView, model=Course):
     name = "Course"
     name_plural = "Courses"
     icon = "fa-solid fa-book"
@@ -136,12 +209,14 @@ class CourseAdmin(ModelView, model=Course):
         Course.id,
         Course.title,
         Course.description,
+        Course.language,
+        Course.enrollment_count,
         Course.created_at,
     ]
 
     # Search / sort
     column_searchable_list = [Course.title, Course.description]
-    column_sortable_list = [Course.id, Course.title, Course.created_at]
+    column_sortable_list = [Course.id, Course.title, Course.language, Course.enrollment_count, Course.created_at]
     column_default_sort = ("created_at", True)
 
     # Export
@@ -149,13 +224,19 @@ class CourseAdmin(ModelView, model=Course):
         Course.id,
         Course.title,
         Course.description,
+        Course.language,
         Course.created_at,
     ]
     export_types = ["csv", "json"]
     export_max_rows = 0
 
     # Forms
-    form_excluded_columns = [Course.created_at, Course.updated_at, Course.enrollments]
+    form_excluded_columns = [
+        Course.created_at,
+        Course.updated_at,
+        Course.enrollments,
+        Course.enrollment_count,
+    ]
     form_include_pk = False
 
     # Pagination
@@ -167,12 +248,23 @@ class CourseAdmin(ModelView, model=Course):
         Course.id: "ID",
         Course.title: "Title",
         Course.description: "Description",
+        Course.language: "Language",
+        Course.enrollment_count: "Learners",
         Course.created_at: "Created",
         Course.updated_at: "Updated",
     }
 
+    async def on_model_delete(self, model: Course, request: Request) -> None:
+        await delete_enrollments(model, Enrollment.course_id == model.id)
+
+    async def after_model_change(self, data: dict, model: Course, is_created: bool, request: Request) -> None:
+        invalidate_catalog()
+
+    async def after_model_delete(self, model: Course, request: Request) -> None:
+        invalidate_catalog()
 
-class EnrollmentAdmin(ModelView, model=Enrollment):
+
+class EnrollmentAdmin(StreamingExportMixin, ModelView, model=Enrollment):
     name = "Enrollment"
     name_plural = "Enrollments"
     icon = "fa-solid fa-graduation-cap"
@@ -185,11 +277,22 @@ class EnrollmentAdmin(ModelView, model=Enrollment):
         Enrollment.enrolled_at,
     ]
 
-    # Search / sort
+    # Search / sort — the User and Course columns search and sort by
+    # username and course title, see search_query / sort_query
     column_searchable_list = [Enrollment.id]
-    column_sortable_list = [Enrollment.id, Enrollment.enrolled_at]
+    column_sortable_list = [Enrollment.id, Enrollment.user, Enrollment.course, Enrollment.enrolled_at]
     column_default_sort = ("enrolled_at", True)
 
+    # Relationship columns sort by username / case-insensitive title. The
+    # tie-breakers make the order total and match the index order of
+    # uq_enrollments_user_course and ix_enrollments_course_id (plus rowid),
+    # so the planner walks the users / courses index and probes enrollments
+    # instead of sorting the whole join
+    related_sort_columns = {
+        "user": (Enrollment.user, (User.username, Enrollment.course_id)),
+        "course": (Enrollment.course, (func.lower(Course.title), Course.id, Enrollment.id)),
+    }
+
     # Export
     column_export_list = [
         Enrollment.id,
@@ -218,6 +321,71 @@ class EnrollmentAdmin(ModelView, model=Enrollment):
         Enrollment.enrolled_at: "Enrolled At",
     }
 
+    def details_query(self, request: Request) -> Select:
+        """One query for the detail page: user and course are many-to-one."""
+        return self._stmt_by_identifier(request.path_params["pk"]).options(
+            joinedload(Enrollment.user),
+            joinedload(Enrollment.course),
+        )
+
+    def search_placeholder(self) -> str:
+        return "ID, user, course title"
+
+    def search_query(self, stmt: Select, term: str) -> Select:
+        """
+        Match the enrollment id, the user (trigram index) or the course
+        (full-text index). Each side resolves to a set of ids first, so
+        enrollments are probed through their user_id / course_id indexes
+        instead of LIKE-scanning a join.
+        """
+        dialect = engine.dialect.name
+        conditions = []
+        # ASCII digits only: isdigit() accepts "²", which int() rejects.
+        # Longer digit strings can't be an id and would overflow the driver
+        digits = term.strip()
+        if digits.isascii() and digits.isdecimal() and int(digits) <= MAX_ID:
+            conditions.append(Enrollment.id == int(digits))
+        if user_terms := trigram_terms(term):
+            conditions.append(
+                Enrollment.user_id.in_(select(User.id).where(user_search_filter(dialect, user_terms)))
+            )
+        if course_terms := search_terms(term):
+            conditions.append(
+                Enrollment.course_id.in_(select(Course.id).where(course_search_filter(dialect, course_terms)))
+            )
+        return stmt.where(or_(false(), *conditions))
+
+    def sort_query(self, stmt: Select, request: Request) -> Select:
+        sort_by = request.query_params.get("sortBy")
+        if sort_by not in self.related_sort_columns:
+            return super().sort_query(stmt, request)
+
+        relationship, columns = self.related_sort_columns[sort_by]
+        order = desc if request.query_params.get("sort") == "desc" else asc
+        return stmt.join(relationship).order_by(*(order(column) for column in columns))
+
+    async def count(self, request: Request, stmt: Select | None = None) -> int:
+        # Sorting joins don't change the number of rows; without a search
+        # count the table directly instead of the sorted, joined query
+        if not request.query_params.get("search"):
+            stmt = None
+        return await super().count(request, stmt)
+
+    # Keep Course.enrollment_count in step with admin edits. New rows are
+    # counted when they are flushed (core.enrollment_counts); here a row
+    # moved to another course is recounted in the transaction that moves it
+    async def on_model_change(self, data: dict, model: Enrollment, is_created: bool, request: Request) -> None:
+        if is_created or not data.get("course"):
+            return
+        (course_id,) = object_identifier_values(data["course"], Course)
+        if course_id != model.course_id:
+            session = async_object_session(model)
+            await adjust_enrollment_count(session, model.course_id, -1)
+            await adjust_enrollment_count(session, course_id, 1)
+
+    async def on_model_delete(self, model: Enrollment, request: Request) -> None:
+        await adjust_enrollment_count(async_object_session(model), model.course_id, -1)
+
 
 # ── Factory ──────────────────────────────────────────────────────────────
 
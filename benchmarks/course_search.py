@@ -0,0 +1,119 @@
+"""
+FTS5 course search against the LIKE scans SQLAdmin's search box issues.
+
+Seeds COURSES courses with generated titles and descriptions into a
+throwaway SQLite database (the FTS index is filled by the triggers from
+migrations), then times the same keyword queries both ways: the ranked
+/api/courses/search statement, and the page plus COUNT(*) that SQLAdmin
+runs for `title LIKE '%term%' OR description LIKE '%term%'`. Also checks
+the FTS plan uses the virtual table index.
+
+Descriptions mix a small set of common words with a long tail of rare
+ones, so both selective and very broad keywords are measured. Broad ones
+are the FTS worst case: bm25 has to rank every match before the LIMIT.
+
+    python -m benchmarks.course_search [--courses 100000]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import func, insert, or_, select
+
+from core.search import course_search_stmt
+from database import make_engine
+from migrations import run_migrations
+from models import Base, Course
+
+
+WORDS = (
+    "python rust java golang javascript typescript kotlin swift haskell scala "
+    "algorithms data structures networks databases compilers graphics security "
+    "beginners advanced intermediate masterclass projects practice patterns "
+    "concurrency testing web mobile systems embedded cloud devops machine learning "
+    "functional objects memory performance interviews fundamentals tooling"
+).split()
+
+SYLLABLES = "ka ri to mo na se lu vi de po ga zu fe hi jo".split()
+
+QUERIES = [["python"], ["rust", "concurrency"], ["datab"], ["karito"], ["mona", "sel"], ["zzz"]]
+
+
+def rare_words(rng: random.Random, count: int) -> list[str]:
+    return ["".join(rng.choices(SYLLABLES, k=3)) for _ in range(count)]
+
+
+async def seed(engine, courses: int, batch: int = 20_000) -> None:
+    rng = random.Random(42)
+    tail = rare_words(rng, 20_000)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(run_migrations)
+        for start in range(0, courses, batch):
+            await conn.execute(insert(Course), [
+                {
+                    "title": f"{' '.join(rng.sample(WORDS, 3)).title()} {i}",
+                    "description": " ".join(rng.choices(WORDS, k=4) + rng.sample(tail, 8)),
+                }
+                for i in range(start, min(start + batch, courses))
+            ])
+
+
+def like_stmt(terms: list[str]):
+    stmt = select(Course)
+    for term in terms:
+        pattern = f"%{term}%"
+        stmt = stmt.where(or_(Course.title.ilike(pattern), Course.description.ilike(pattern)))
+    return stmt.order_by(Course.id)
+
+
+async def timed(conn, stmts, repeat: int) -> tuple[float, list]:
+    """Mean ms per run of `stmts`, and the rows of the last statement."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for stmt in stmts:
+            rows = (await conn.execute(stmt)).all()
+    return (time.perf_counter() - started) / repeat * 1000, rows
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--courses", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}")
+        await seed(engine, args.courses)
+
+        async with engine.connect() as conn:
+            for terms in QUERIES:
+                fts = course_search_stmt("sqlite", terms).limit(args.limit)
+                like = like_stmt(terms)
+                like_page = [like.limit(args.limit), select(func.count()).select_from(like.subquery())]
+
+                compiled = fts.compile(dialect=conn.dialect)
+                params = compiled.construct_params()
+                plan = " | ".join(row[-1] for row in (await conn.exec_driver_sql(
+                    "EXPLAIN QUERY PLAN " + str(compiled),
+                    tuple(params[name] for name in compiled.positiontup),
+                )).all())
+                assert "VIRTUAL TABLE INDEX" in plan, plan
+
+                fts_ms, fts_rows = await timed(conn, [fts], args.repeat)
+                like_ms, [(like_total,)] = await timed(conn, like_page, args.repeat)
+                print(
+                    f"{' '.join(terms):<22} fts5={fts_ms:8.3f} ms ({len(fts_rows):>3} rows)  "
+                    f"like+count={like_ms:9.3f} ms ({like_total:>6} matches)"
+                )
+
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,130 @@
+"""
+Enrollment lookups before and after the enrollment indexes.
+
+Seeds USERS users, COURSES courses and ENROLLMENTS enrollment rows into a
+throwaway SQLite database laid out like an older install (no enrollment
+indexes), times the hot queries, runs the startup migrations, and times
+them again. Query plans after migration are asserted to use the indexes.
+
+    python -m benchmarks.enrollment_indexes [--enrollments 10000000]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from sqlalchemy import delete, exists, func, select, text
+
+from database import make_engine
+from migrations import run_migrations
+from models import Base, Enrollment
+
+
+def queries(user_id: int, course_id: int) -> dict:
+    return {
+        "is enrolled": (
+            select(exists().where(
+                Enrollment.user_id == user_id,
+                Enrollment.course_id == course_id,
+            )),
+            "uq_enrollments_user_course",
+        ),
+        "courses of user": (
+            select(Enrollment).where(Enrollment.user_id == user_id),
+            "uq_enrollments_user_course",
+        ),
+        "learners of course": (
+            select(Enrollment.id).where(Enrollment.course_id == course_id).limit(100),
+            "ix_enrollments_course_id",
+        ),
+        "count for course": (
+            select(func.count()).where(Enrollment.course_id == course_id),
+            "ix_enrollments_course_id",
+        ),
+    }
+
+
+async def seed(engine, users: int, courses: int, enrollments: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        for name in ("uq_enrollments_user_course", "ix_enrollments_course_id"):
+            await conn.execute(text(f"DROP INDEX {name}"))
+
+        await conn.execute(text(
+            "WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < :n) "
+            "INSERT INTO users (id, username, email, hashed_password, created_at, updated_at) "
+            "SELECT n, 'user' || n, 'user' || n || '@example.com', 'x', "
+            "'2024-01-01', '2024-01-01' FROM seq"
+        ), {"n": users})
+        await conn.execute(text(
+            "WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < :n) "
+            "INSERT INTO courses (id, title, created_at, updated_at) "
+            "SELECT n, 'Course ' || n, '2024-01-01', '2024-01-01' FROM seq"
+        ), {"n": courses})
+        # Pairs (n % users + 1, n / users + 1) are distinct for n < users * courses
+        await conn.execute(text(
+            "WITH RECURSIVE seq(n) AS (SELECT 0 UNION ALL SELECT n + 1 FROM seq WHERE n < :n - 1) "
+            "INSERT INTO enrollments (user_id, course_id, enrolled_at) "
+            "SELECT n % :users + 1, n / :users + 1, '2024-01-01' FROM seq"
+        ), {"n": enrollments, "users": users})
+
+
+async def explain(conn, stmt) -> str:
+    compiled = stmt.compile(dialect=conn.dialect)
+    params = compiled.construct_params()
+    positional = tuple(params[name] for name in compiled.positiontup)
+    result = await conn.exec_driver_sql("EXPLAIN QUERY PLAN " + str(compiled), positional)
+    return " | ".join(row[-1] for row in result.all())
+
+
+async def measure(engine, users: int, courses: int, repeat: int, check_plans: bool) -> dict:
+    timings = {}
+    async with engine.connect() as conn:
+        for name, (stmt, index_name) in queries(users // 2, courses // 2).items():
+            if check_plans:
+                plan = await explain(conn, stmt)
+                assert index_name in plan, plan
+            started = time.perf_counter()
+            for _ in range(repeat):
+                await conn.execute(stmt)
+            timings[name] = (time.perf_counter() - started) / repeat * 1000
+
+    async with engine.begin() as conn:
+        started = time.perf_counter()
+        await conn.execute(delete(Enrollment).where(Enrollment.user_id == users))
+        timings["delete user's rows"] = (time.perf_counter() - started) * 1000
+        await conn.rollback()
+    return timings
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--courses", type=int, default=10_000)
+    parser.add_argument("--enrollments", type=int, default=10_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    assert args.enrollments <= args.users * args.courses
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}")
+        await seed(engine, args.users, args.courses, args.enrollments)
+        before = await measure(engine, args.users, args.courses, args.repeat, check_plans=False)
+
+        started = time.perf_counter()
+        async with engine.begin() as conn:
+            await conn.run_sync(run_migrations)
+        migrate_s = time.perf_counter() - started
+
+        after = await measure(engine, args.users, args.courses, args.repeat * 100, check_plans=True)
+        await engine.dispose()
+
+    print(f"{args.enrollments:,} enrollments, migration took {migrate_s:.1f} s")
+    for name in before:
+        print(f"{name:<20} before={before[name]:10.3f} ms  after={after[name]:8.3f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,139 @@
+"""
+Bytes on the wire and CPU cost of CompressionMiddleware.
+
+Drives the middleware directly with a minimal ASGI app that returns
+representative payloads (the rendered home page, list_users/list_courses
+JSON pages of 100 and 500 rows, and an NDJSON export streamed in chunks)
+and reports, per available coding, the compressed size and the CPU time
+the middleware adds per response compared with passing the body through.
+
+    python -m benchmarks.response_compression [--repeat 200]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import UTC, datetime
+
+from core.catalog import CatalogSection, render_catalog
+from core.compression import ENCODERS
+from middleware import CompressionMiddleware
+from templating import templates
+
+
+def user_rows(count: int) -> list[dict]:
+    now = datetime.now(UTC).isoformat()
+    return [
+        {
+            "id": i,
+            "username": f"learner{i}",
+            "email": f"learner{i}@example.com",
+            "first_name": "Ada" if i % 2 else None,
+            "last_name": "Lovelace" if i % 3 else None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def course_rows(count: int) -> list[dict]:
+    now = datetime.now(UTC).isoformat()
+    return [
+        {
+            "id": i,
+            "title": f"Course {i}: practical programming",
+            "description": "Hands-on lessons with exercises and projects.",
+            "language": "python",
+            "enrollment_count": i * 7 % 1000,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def home_page() -> bytes:
+    section = CatalogSection("python", "Python", "Python", "python", [
+        type("Row", (), {"title": f"Python course {i}", "description": "Learn by building."})
+        for i in range(32)
+    ])
+    catalog = render_catalog([section])
+    html = templates.get_template("base.html").render(
+        {"user": None, "catalog": catalog, "url_for": lambda *a, **k: "/"}
+    )
+    return html.encode()
+
+
+def payloads() -> dict[str, tuple[str, list[bytes]]]:
+    ndjson = [json.dumps(row).encode() + b"\n" for row in user_rows(5000)]
+    return {
+        "home page (html)": ("text/html; charset=utf-8", [home_page()]),
+        "list_users 100 (json)": ("application/json", [json.dumps(user_rows(100)).encode()]),
+        "list_users 500 (json)": ("application/json", [json.dumps(user_rows(500)).encode()]),
+        "list_courses 500 (json)": ("application/json", [json.dumps(course_rows(500)).encode()]),
+        "export 5k users (ndjson)": (
+            "application/x-ndjson",
+            [b"".join(ndjson[i:i + 1000]) for i in range(0, len(ndjson), 1000)],
+        ),
+    }
+
+
+def make_app(content_type: str, chunks: list[bytes]):
+    async def app(scope, receive, send):
+        headers = [(b"content-type", content_type.encode())]
+        if len(chunks) == 1:
+            headers.append((b"content-length", str(len(chunks[0])).encode()))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        for index, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": index < len(chunks) - 1})
+    return app
+
+
+async def run(app, coding: str, repeat: int) -> tuple[float, int]:
+    """Mean CPU ms per request and bytes sent for `coding`."""
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(b"accept-encoding", coding.encode())],
+    }
+    sent = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal sent
+        if message["type"] == "http.response.body":
+            sent += len(message.get("body", b""))
+
+    started = time.process_time()
+    for _ in range(repeat):
+        sent = 0
+        await app(dict(scope), receive, send)
+    return (time.process_time() - started) / repeat * 1000, sent
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    codings = ["identity", *ENCODERS]
+    print(f"codings available: {', '.join(ENCODERS)}")
+    for name, (content_type, chunks) in payloads().items():
+        app = CompressionMiddleware(make_app(content_type, chunks))
+        baseline_ms, raw_bytes = await run(app, "identity", args.repeat)
+        print(f"\n{name}: {raw_bytes:,} bytes uncompressed")
+        for coding in codings[1:]:
+            cpu_ms, wire_bytes = await run(app, coding, args.repeat)
+            print(
+                f"  {coding:<5} {wire_bytes:>9,} bytes ({wire_bytes / raw_bytes:6.1%})  "
+                f"+{cpu_ms - baseline_ms:7.3f} ms CPU per response"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,136 @@
+"""
+Read concurrency under mixed load: default engine vs. the tuned profile.
+
+Seeds a throwaway database, then starts WORKERS reader processes (standing
+in for uvicorn workers, each running READERS concurrent SELECT tasks) next
+to one writer process inserting rows in a loop. Reports reads/s, writes/s
+and "database is locked" failures for each setup.
+
+    python -m benchmarks.sqlite_read_concurrency [--workers 4] [--seconds 5]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import OperationalError
+
+from database import make_engine
+from models import Base, User
+
+
+async def seed(url: str, rows: int) -> None:
+    # Untuned: WAL would persist in the file and leak into the default run
+    setup_engine = make_engine(url, tuned=False)
+    async with setup_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(User), [
+            {"username": f"user{i}", "email": f"user{i}@example.com", "hashed_password": "x"}
+            for i in range(rows)
+        ])
+    await setup_engine.dispose()
+
+
+async def read_worker(url: str, tuned: bool, readers: int, seconds: float, rows: int) -> dict:
+    reader = make_engine(url, read_only=True, tuned=tuned)
+    stats = {"reads": 0, "writes": 0, "locked": 0}
+    deadline = time.perf_counter() + seconds
+
+    async def read_loop():
+        while time.perf_counter() < deadline:
+            try:
+                async with reader.connect() as conn:
+                    user_id = random.randint(1, rows)
+                    await conn.execute(select(User).where(User.id == user_id))
+                    await conn.execute(select(User.id).where(User.id > user_id).limit(50))
+                stats["reads"] += 1
+            except OperationalError:
+                stats["locked"] += 1
+
+    await asyncio.gather(*(read_loop() for _ in range(readers)))
+    await reader.dispose()
+    return stats
+
+
+async def write_worker(url: str, tuned: bool, seconds: float) -> dict:
+    writer = make_engine(url, tuned=tuned)
+    stats = {"reads": 0, "writes": 0, "locked": 0}
+    deadline = time.perf_counter() + seconds
+    n = 0
+    while time.perf_counter() < deadline:
+        n += 1
+        try:
+            async with writer.begin() as conn:
+                await conn.execute(insert(User).values(
+                    username=f"writer-{n}",
+                    email=f"writer-{n}@example.com",
+                    hashed_password="x",
+                ))
+            stats["writes"] += 1
+        except OperationalError:
+            stats["locked"] += 1
+    await writer.dispose()
+    return stats
+
+
+def _process_main(role: str, args: tuple, results) -> None:
+    if role == "writer":
+        results.put(asyncio.run(write_worker(*args)))
+    else:
+        results.put(asyncio.run(read_worker(*args)))
+
+
+def run(url: str, tuned: bool, opts: argparse.Namespace) -> dict:
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(
+            target=_process_main,
+            args=("writer", (url, tuned, opts.seconds), results),
+        )
+    ] + [
+        multiprocessing.Process(
+            target=_process_main,
+            args=("reader", (url, tuned, opts.readers, opts.seconds, opts.rows), results),
+        )
+        for _ in range(opts.workers)
+    ]
+    for process in processes:
+        process.start()
+
+    totals = {"reads": 0, "writes": 0, "locked": 0}
+    for _ in processes:
+        for key, value in results.get().items():
+            totals[key] += value
+    for process in processes:
+        process.join()
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--rows", type=int, default=50_000)
+    opts = parser.parse_args()
+
+    for tuned in (False, True):
+        with tempfile.TemporaryDirectory() as tmp:
+            url = f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}"
+            asyncio.run(seed(url, opts.rows))
+            stats = run(url, tuned, opts)
+
+        label = "tuned (WAL + reader pool)" if tuned else "default"
+        print(
+            f"{label:<26} reads/s={stats['reads'] / opts.seconds:>9.1f}  "
+            f"writes/s={stats['writes'] / opts.seconds:>8.1f}  locked={stats['locked']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -11,6 +13,107 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "change-me-to-a-random-secret-key"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14
+
+    # "database": cookie holds the user id, resolved against the users table
+    # "jwt": cookie holds a signed access token, resolved in-process; once it
+    #        expires, AuthMiddleware renews it from the refresh cookie
+    SESSION_MODE: Literal["database", "jwt"] = "database"
+
+    # Database — sqlite+aiosqlite:///... or postgresql+asyncpg://...
+    DATABASE_URL: str = "sqlite+aiosqlite:///./codeatlas.db"
+    DATABASE_READ_URL: str | None = None  # e.g. a Postgres replica
+    DB_POOL_SIZE: int = 10  # server databases; SQLite uses DB_WRITE_*
+    DB_MAX_OVERFLOW: int = 20
+    DB_WRITE_POOL_SIZE: int = 1
+    DB_WRITE_MAX_OVERFLOW: int = 0
+    DB_READ_POOL_SIZE: int = 8
+    DB_READ_MAX_OVERFLOW: int = 8
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
+    # PostgreSQL
+    DB_APPLICATION_NAME: str = "codeatlas"
+    DB_STATEMENT_TIMEOUT_MS: int = 15_000
+    PG_PREPARED_STATEMENT_CACHE_SIZE: int = 256
+
+    # SQLite tuning profile, applied to every new connection
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_KB: int = 65_536
+    SQLITE_MMAP_SIZE: int = 268_435_456
+    SQLITE_TEMP_STORE: str = "MEMORY"
+
+    # Rows fetched per query by the streaming exports
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Bulk import endpoints. Users are capped much lower: every row is an
+    # Argon2 hash (roughly 50-100 ms of CPU)
+    BULK_MAX_ROWS: int = 10_000
+    BULK_MAX_USER_ROWS: int = 500
+    BULK_INSERT_BATCH_SIZE: int = 500
+
+    # Course popularity
+    TOP_COURSES_CACHE_TTL_SECONDS: float = 60.0
+
+    # Rendered course catalog on the home page; writes invalidate it,
+    # the TTL bounds staleness across worker processes
+    CATALOG_CACHE_TTL_SECONDS: float = 300.0
+
+    # Cache-Control max-age of the public catalog endpoints
+    CATALOG_HTTP_MAX_AGE_SECONDS: int = 60
+
+    # In-process cache of users resolved by AuthMiddleware
+    USER_CACHE_MAX_SIZE: int = 10_000
+    USER_CACHE_TTL_SECONDS: float = 60.0
+
+    # Argon2 worker pool; requests beyond workers + pending get a 503
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 32
+
+    # Dynamic response compression (CompressionMiddleware)
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    COMPRESSION_MEDIA_TYPES: list[str] = [
+        "text/html",
+        "text/plain",
+        "text/css",
+        "text/csv",
+        "text/javascript",
+        "application/javascript",
+        "application/json",
+        "application/x-ndjson",
+        "image/svg+xml",
+    ]
+
+    # SQL instrumentation (core.query_stats). SQL_SERVER_TIMING adds a
+    # Server-Timing header with each request's query count and DB time
+    SQL_SERVER_TIMING: bool = False
+    SQL_SLOW_QUERY_MS: float = 200.0
+    SQL_EXPLAIN_SLOW_QUERIES: bool = True
+    # Warn when one request runs the same statement more often than this
+    SQL_REPEATED_QUERY_THRESHOLD: int = 10
+
+    # Expose core.metrics at GET /metrics. Off by default: it lists every
+    # route with its traffic and latency. When METRICS_TOKEN is set, scrapers
+    # must send "Authorization: Bearer <token>"; without a token, only enable
+    # it where the proxy keeps /metrics off the public internet
+    METRICS_ENABLED: bool = False
+    METRICS_TOKEN: str | None = None
+
+    # Requests under these prefixes never resolve the session user
+    AUTH_SKIP_PATH_PREFIXES: list[str] = [
+        "/static",
+        "/api/admin",
+        "/admin",
+        "/docs",
+        "/redoc",
+        "/openapi.json",
+    ]
 
 
 settings = Settings()
@@ -0,0 +1,173 @@
+"""
+Fingerprinted, precompressed static assets.
+
+`python -m core.assets` copies every file under static/ to static/dist/
+with a content hash in its name (css/main.css -> css/main.1a2b3c4d.css),
+writes .gz and, when the `brotli` package is installed, .br siblings for
+text assets, and records the mapping in static/dist/manifest.json.
+
+Templates call asset_url("css/main.css"), which resolves the hashed URL
+from the manifest, or the plain /static path when no build has been run.
+AssetFiles serves /static: hashed files get the best precompressed
+variant the client accepts and are cached for a year as immutable.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import mimetypes
+import shutil
+from functools import cache
+from pathlib import Path
+
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+try:
+    import brotli
+except ImportError:  # optional: uv sync --extra assets
+    brotli = None
+
+STATIC_DIR = Path("static")
+DIST = "dist"
+MANIFEST = "manifest.json"
+STATIC_URL = "/static/"
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# Already-compressed formats (images, fonts) gain nothing from gzip/brotli
+COMPRESSIBLE = {".css", ".js", ".mjs", ".map", ".json", ".svg", ".txt", ".html", ".xml"}
+
+# Preferred first
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+
+# ── Build ──
+
+def fingerprint(path: Path, content: bytes) -> Path:
+    digest = hashlib.sha256(content).hexdigest()[:12]
+    return path.with_name(f"{path.stem}.{digest}{path.suffix}")
+
+
+def compress(target: Path, content: bytes) -> list[str]:
+    """Write the compressed siblings of `target` that are actually smaller."""
+    written = []
+    variants = {".gz": gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(content, quality=11)
+    for suffix, data in variants.items():
+        if len(data) < len(content):
+            target.with_name(target.name + suffix).write_bytes(data)
+            written.append(suffix)
+    return written
+
+
+def build(static_dir: Path = STATIC_DIR) -> dict[str, str]:
+    """Rebuild static/dist from static/ and return the manifest."""
+    dist = static_dir / DIST
+    if dist.exists():
+        shutil.rmtree(dist)
+
+    manifest = {}
+    for source in sorted(static_dir.rglob("*")):
+        relative = source.relative_to(static_dir)
+        if not source.is_file() or relative.parts[0] == DIST:
+            continue
+
+        content = source.read_bytes()
+        hashed = fingerprint(relative, content)
+        target = dist / hashed
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(content)
+
+        variants = compress(target, content) if source.suffix in COMPRESSIBLE else []
+        manifest[relative.as_posix()] = hashed.as_posix()
+        print(f"{relative} -> {DIST}/{hashed} {' '.join(variants)}".rstrip())
+
+    (dist / MANIFEST).write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    if brotli is None:
+        print("brotli is not installed; only .gz variants were written")
+    return manifest
+
+
+# ── Lookup ──
+
+@cache
+def load_manifest(static_dir: Path = STATIC_DIR) -> dict[str, str]:
+    """The build manifest, or {} before the first build. Read once per process."""
+    try:
+        return json.loads((static_dir / DIST / MANIFEST).read_text())
+    except FileNotFoundError:
+        return {}
+
+
+def asset_url(path: str) -> str:
+    """URL of a static asset: the fingerprinted file if built, else the source."""
+    hashed = load_manifest().get(path)
+    if hashed is None:
+        return STATIC_URL + path
+    return f"{STATIC_URL}{DIST}/{hashed}"
+
+
+# ── Serving ──
+
+def accepted_encodings(headers: Headers) -> set[str]:
+    """Content codings of Accept-Encoding that are not refused with q=0."""
+    accepted = set()
+    for item in headers.get("accept-encoding", "").split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = params.strip().removeprefix("q=")
+        try:
+            if params and float(quality) == 0:
+                continue
+        except ValueError:
+            continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class AssetFiles(StaticFiles):
+    """
+    StaticFiles that serves fingerprinted files under dist/ precompressed
+    and immutable. Everything else is served as before.
+    """
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if not path.startswith(DIST + "/") or path.endswith((".gz", ".br")):
+            return await super().get_response(path, scope)
+
+        accepted = accepted_encodings(Headers(scope=scope))
+        response = None
+        for coding, suffix in ENCODINGS:
+            if coding not in accepted and "*" not in accepted:
+                continue
+            try:
+                response = await super().get_response(path + suffix, scope)
+            except HTTPException:
+                continue
+            response.headers["content-encoding"] = coding
+            if response.status_code == 200:
+                media_type, _ = mimetypes.guess_type(path)
+                media_type = media_type or "application/octet-stream"
+                if media_type.startswith("text/"):
+                    media_type += "; charset=utf-8"
+                response.headers["content-type"] = media_type
+            break
+
+        if response is None:
+            response = await super().get_response(path, scope)
+
+        response.headers["vary"] = "Accept-Encoding"
+        response.headers["cache-control"] = IMMUTABLE
+        return response
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build fingerprinted static assets")
+    parser.add_argument("--static-dir", type=Path, default=STATIC_DIR)
+    build(parser.parse_args().static_dir)
@@ -0,0 +1,74 @@
+import json
+
+from fastapi import HTTPException, Request, status
+from pydantic import BaseModel, ValidationError
+
+from config import settings
+from schemas.bulk import BulkReport, BulkRowResult
+
+NDJSON_TYPES = ("application/x-ndjson", "application/jsonl", "application/ndjson")
+
+
+# ── Request Parsing ──
+
+async def read_bulk_rows(request: Request, max_rows: int = settings.BULK_MAX_ROWS) -> list:
+    """
+    Parse a bulk request body: a JSON array, or NDJSON (one object per
+    line) when sent with an NDJSON content type. More than `max_rows`
+    rows is a 413.
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+
+    try:
+        if content_type in NDJSON_TYPES:
+            rows = [json.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            rows = json.loads(body)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Body must be a JSON array or NDJSON",
+        )
+
+    if not isinstance(rows, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Body must be a JSON array or NDJSON",
+        )
+    if len(rows) > max_rows:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=f"At most {max_rows} rows per request",
+        )
+    return rows
+
+
+def validate_rows(rows: list, schema: type[BaseModel]) -> tuple[dict[int, BaseModel], dict[int, BulkRowResult]]:
+    """Validate every row against `schema`. Returns (valid, invalid) keyed by row index."""
+    valid, invalid = {}, {}
+    for index, row in enumerate(rows):
+        try:
+            valid[index] = schema.model_validate(row)
+        except ValidationError as exc:
+            invalid[index] = BulkRowResult(
+                index=index,
+                status="invalid",
+                detail=exc.errors(include_url=False, include_context=False),
+            )
+    return valid, invalid
+
+
+def build_report(results: dict[int, BulkRowResult]) -> BulkReport:
+    ordered = [results[index] for index in sorted(results)]
+    return BulkReport(
+        created=sum(result.status == "created" for result in ordered),
+        duplicates=sum(result.status == "duplicate" for result in ordered),
+        invalid=sum(result.status == "invalid" for result in ordered),
+        results=ordered,
+    )
+
+
+def batches(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
@@ -0,0 +1,85 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable
+
+from config import settings
+from core.metrics import cache_lookups
+
+_MISSING = object()
+
+
+# ── TTL + LRU Cache ──
+
+class TTLCache:
+    """
+    Bounded in-process cache with per-entry expiry.
+
+    Entries are evicted least-recently-used once `maxsize` is reached and
+    are treated as absent once older than `ttl` seconds. Each worker
+    process owns its own instance, so the TTL is also the upper bound on
+    how stale an entry can be when another worker mutates the row.
+
+    Hits and misses are counted in core.metrics as
+    cache_lookups_total{cache=`name`}.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = Lock()
+        for result in ("hit", "miss"):
+            cache_lookups.inc(name, result, amount=0)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for `key`, or `default` if absent/expired."""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                else:
+                    del self._data[key]
+                    entry = _MISSING
+        if entry is _MISSING:
+            cache_lookups.inc(self.name, "miss")
+            return default
+        cache_lookups.inc(self.name, "hit")
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store `value` under `key`, evicting the oldest entry if full."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """Invalidate a single entry."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Invalidate every entry."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# ── Shared Caches ──
+
+# Users resolved from the session cookie by AuthMiddleware, keyed by user id.
+# Invalidate on every user update/delete.
+user_cache = TTLCache(
+    "user",
+    maxsize=settings.USER_CACHE_MAX_SIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,108 @@
+"""
+Course catalog shown on the home page and in the navbar dropdown.
+
+Both fragments are rendered from the courses table once and kept in
+`catalog_cache` until a course is created, updated or deleted, so a page
+view costs a single cache lookup. Call `invalidate_catalog()` after any
+such write.
+"""
+
+from dataclasses import dataclass, field
+
+from markupsafe import Markup
+from sqlalchemy import select
+
+from config import settings
+from core.cache import TTLCache
+from database import ReadSessionLocal
+from models import Course
+from templating import templates
+
+
+@dataclass(frozen=True)
+class Language:
+    name: str
+    badge: str
+    thumb_class: str
+
+
+# Display order and styling of the known languages, keyed by Course.language
+LANGUAGES: dict[str, Language] = {
+    "c": Language("C", "C", "c"),
+    "cpp": Language("C++", "C++", "cpp"),
+    "csharp": Language("C#", "C#", "csharp"),
+    "python": Language("Python", "Python", "python"),
+    "java": Language("Java", "Java", "java"),
+    "go": Language("Go", "Go", "go"),
+    "rust": Language("Rust", "Rust", "rust"),
+    "javascript": Language("JavaScript", "JS", "js"),
+}
+
+
+@dataclass
+class CatalogSection:
+    slug: str
+    name: str
+    badge: str
+    thumb_class: str
+    courses: list = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class Catalog:
+    """Pre-rendered HTML fragments, safe to drop into base.html as-is."""
+    dropdown: Markup
+    sections: Markup
+
+
+_CATALOG_KEY = "catalog"
+
+catalog_cache = TTLCache("catalog", maxsize=1, ttl=settings.CATALOG_CACHE_TTL_SECONDS)
+
+
+def invalidate_catalog() -> None:
+    """Drop the rendered catalog; the next page view rebuilds it."""
+    catalog_cache.pop(_CATALOG_KEY)
+
+
+def group_courses(rows) -> list[CatalogSection]:
+    """Group (title, description, language) rows into ordered sections."""
+    sections: dict[str, CatalogSection] = {}
+    for row in rows:
+        slug = row.language
+        section = sections.get(slug)
+        if section is None:
+            language = LANGUAGES.get(slug) or Language(slug.title(), slug.title(), "")
+            section = sections[slug] = CatalogSection(
+                slug=slug,
+                name=language.name,
+                badge=language.badge,
+                thumb_class=language.thumb_class,
+            )
+        section.courses.append(row)
+
+    order = {slug: position for position, slug in enumerate(LANGUAGES)}
+    return sorted(sections.values(), key=lambda s: (order.get(s.slug, len(order)), s.slug))
+
+
+def render_catalog(sections: list[CatalogSection]) -> Catalog:
+    context = {"sections": sections}
+    return Catalog(
+        dropdown=Markup(templates.get_template("partials/catalog_dropdown.html").render(context)),
+        sections=Markup(templates.get_template("partials/catalog_sections.html").render(context)),
+    )
+
+
+async def get_catalog() -> Catalog:
+    """Return the rendered catalog, querying and rendering only on a miss."""
+    catalog = catalog_cache.get(_CATALOG_KEY)
+    if catalog is None:
+        async with ReadSessionLocal() as db:
+            result = await db.execute(
+                select(Course.title, Course.description, Course.language)
+                .where(Course.language.is_not(None))
+                .order_by(Course.language, Course.id)
+            )
+            catalog = render_catalog(group_courses(result.all()))
+        catalog_cache.set(_CATALOG_KEY, catalog)
+    return catalog
@@ -0,0 +1,66 @@
+"""
+Incremental encoders for CompressionMiddleware.
+
+gzip is always available; brotli and zstd are used when their packages
+are installed (uv sync --extra compression). Every encoder can emit a
+decodable prefix after each chunk, so streamed bodies reach the client
+as they are produced rather than when the compressor's buffer fills.
+"""
+
+import zlib
+
+from config import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class GzipEncoder:
+    def __init__(self):
+        self._compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def encode(self, data: bytes, final: bool) -> bytes:
+        flush_mode = zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH
+        return self._compressor.compress(data) + self._compressor.flush(flush_mode)
+
+
+class BrotliEncoder:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+
+    def encode(self, data: bytes, final: bool) -> bytes:
+        out = self._compressor.process(data)
+        return out + (self._compressor.finish() if final else self._compressor.flush())
+
+
+class ZstdEncoder:
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=settings.COMPRESSION_ZSTD_LEVEL).compressobj()
+
+    def encode(self, data: bytes, final: bool) -> bytes:
+        flush_mode = zstandard.COMPRESSOBJ_FLUSH_FINISH if final else zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        return self._compressor.compress(data) + self._compressor.flush(flush_mode)
+
+
+# Content-Encoding -> encoder, in server preference order
+ENCODERS: dict[str, type] = {}
+if brotli is not None:
+    ENCODERS["br"] = BrotliEncoder
+if zstandard is not None:
+    ENCODERS["zstd"] = ZstdEncoder
+ENCODERS["gzip"] = GzipEncoder
+
+
+def choose_encoding(accepted: set[str]) -> str | None:
+    """The preferred available coding among those the client accepts."""
+    for coding in ENCODERS:
+        if coding in accepted or "*" in accepted:
+            return coding
+    return None
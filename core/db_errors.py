@@ -0,0 +1,25 @@
+from sqlalchemy.exc import IntegrityError
+
+# ── Unique Constraint Violations ──
+#
+# Field -> names that identify its unique index/constraint in driver error
+# messages (SQLite: "UNIQUE constraint failed: index 'ix_...'" or
+# "users.username"; PostgreSQL: 'violates unique constraint "ix_..."').
+
+USER_UNIQUE_FIELDS = {
+    "username": ("ix_users_username_lower", "users.username", "users_username_key"),
+    "email": ("ix_users_email_lower", "users.email", "users_email_key"),
+}
+
+COURSE_UNIQUE_FIELDS = {
+    "title": ("ix_courses_title_lower",),
+}
+
+
+def unique_violation(exc: IntegrityError, fields: dict[str, tuple[str, ...]]) -> str | None:
+    """Return the field whose unique constraint `exc` violated, if any."""
+    message = str(exc.orig)
+    for field, names in fields.items():
+        if any(name in message for name in names):
+            return field
+    return None
@@ -0,0 +1,82 @@
+from sqlalchemy import Connection, event, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Course, Enrollment
+
+# ── Denormalized Course.enrollment_count ──
+#
+# Every write that adds or removes enrollments adjusts the counter in the
+# same transaction. reconcile_enrollment_counts() recomputes it from the
+# enrollments table to repair any drift (e.g. rows edited outside the app).
+#
+# A counter change is not an edit of the course: every UPDATE below sets
+# updated_at to itself so its onupdate doesn't fire, and updated_at (and
+# Last-Modified) only moves when the course itself is edited.
+
+
+async def adjust_enrollment_count(db: AsyncSession, course_id: int, delta: int) -> None:
+    """Add `delta` to a course's counter. No-op for a zero delta."""
+    if delta:
+        await db.execute(
+            update(Course)
+            .where(Course.id == course_id)
+            .values(enrollment_count=Course.enrollment_count + delta, updated_at=Course.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+
+
+@event.listens_for(Enrollment, "after_insert")
+def count_added_enrollment(mapper, connection: Connection, enrollment: Enrollment) -> None:
+    """
+    Count enrollments inserted through the ORM unit of work (the admin
+    create form) in the flush that inserts them. Statement inserts such as
+    the enroll endpoints' upserts don't fire this and adjust explicitly.
+    """
+    connection.execute(
+        update(Course)
+        .where(Course.id == enrollment.course_id)
+        .values(enrollment_count=Course.enrollment_count + 1, updated_at=Course.updated_at)
+    )
+
+
+async def decrement_for_user(db: AsyncSession, user_id: int) -> None:
+    """Decrement every course the user is enrolled in. Call before deleting their enrollments."""
+    await db.execute(
+        update(Course)
+        .where(Course.id.in_(
+            select(Enrollment.course_id).where(Enrollment.user_id == user_id)
+        ))
+        .values(enrollment_count=Course.enrollment_count - 1, updated_at=Course.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _reconcile_stmt(course_ids: list[int] | None = None):
+    actual = (
+        select(func.count())
+        .where(Enrollment.course_id == Course.id)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(Course)
+        .where(Course.enrollment_count != actual)
+        .values(enrollment_count=actual, updated_at=Course.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    if course_ids is not None:
+        stmt = stmt.where(Course.id.in_(course_ids))
+    return stmt
+
+
+async def reconcile_enrollment_counts(db: AsyncSession, course_ids: list[int] | None = None) -> int:
+    """
+    Recompute counters from the enrollments table (all courses, or just
+    `course_ids`). Returns the number of courses that had drifted.
+    """
+    result = await db.execute(_reconcile_stmt(course_ids))
+    return result.rowcount
+
+
+def reconcile_enrollment_counts_sync(conn: Connection) -> int:
+    """Same as reconcile_enrollment_counts(), for migrations on a sync connection."""
+    return conn.execute(_reconcile_stmt()).rowcount
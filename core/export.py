@@ -0,0 +1,149 @@
+import csv
+import io
+import json
+import time
+from datetime import datetime
+from typing import AsyncIterator, Literal
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from config import settings
+from database import ReadSessionLocal
+from models import Course, Enrollment, User
+
+ExportFormat = Literal["ndjson", "csv", "json"]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "json": "application/json",
+}
+
+# ── Exportable Tables ──
+
+EXPORTS = {
+    "users": (User, ["id", "username", "email", "first_name", "last_name", "created_at", "updated_at"]),
+    "courses": (Course, ["id", "title", "description", "language", "created_at", "updated_at"]),
+    "enrollments": (Enrollment, ["id", "user_id", "course_id", "enrolled_at"]),
+}
+
+
+# ── Row Source ──
+
+async def iter_rows(model, columns: list[str], batch_size: int) -> AsyncIterator[tuple]:
+    """
+    Yield rows of `columns` in id order, fetching `batch_size` rows per
+    keyset query. Only plain tuples are built, so memory stays bounded by
+    one batch regardless of table size.
+    """
+    selected = [getattr(model, name) for name in columns]
+    last_id = None
+
+    async with ReadSessionLocal() as db:
+        while True:
+            stmt = select(model.id, *selected).order_by(model.id).limit(batch_size)
+            if last_id is not None:
+                stmt = stmt.where(model.id > last_id)
+
+            batch = (await db.execute(stmt)).all()
+            if not batch:
+                return
+
+            for row in batch:
+                yield tuple(row[1:])
+            last_id = batch[-1][0]
+
+            if len(batch) < batch_size:
+                return
+
+
+# ── Encoders ──
+#
+# Each yielded chunk becomes one ASGI message, and one compressor flush
+# behind CompressionMiddleware, so rows are buffered into chunks of about
+# CHUNK_SIZE characters rather than sent one by one.
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _plain(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _object(columns: list[str], row: tuple) -> str:
+    return json.dumps(dict(zip(columns, map(_plain, row))), ensure_ascii=False)
+
+
+async def chunked(parts: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Join consecutive `parts` into chunks of at least CHUNK_SIZE characters."""
+    buffer: list[str] = []
+    size = 0
+    async for part in parts:
+        buffer.append(part)
+        size += len(part)
+        if size >= CHUNK_SIZE:
+            yield "".join(buffer)
+            buffer.clear()
+            size = 0
+    if buffer:
+        yield "".join(buffer)
+
+
+async def encode_ndjson(columns: list[str], rows: AsyncIterator[tuple]) -> AsyncIterator[str]:
+    async for chunk in chunked(_object(columns, row) + "\n" async for row in rows):
+        yield chunk
+
+
+async def encode_json(columns: list[str], rows: AsyncIterator[tuple]) -> AsyncIterator[str]:
+    async def parts() -> AsyncIterator[str]:
+        separator = "["
+        async for row in rows:
+            yield separator + _object(columns, row)
+            separator = ","
+        yield "[]" if separator == "[" else "]"
+
+    async for chunk in chunked(parts()):
+        yield chunk
+
+
+async def encode_csv(columns: list[str], rows: AsyncIterator[tuple]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> str:
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
+
+    writer.writerow(columns)
+    async for row in rows:
+        writer.writerow(["" if value is None else _plain(value) for value in row])
+        if buffer.tell() >= CHUNK_SIZE:
+            yield flush()
+    yield flush()
+
+
+ENCODERS = {
+    "ndjson": encode_ndjson,
+    "csv": encode_csv,
+    "json": encode_json,
+}
+
+
+def export_response(
+    model,
+    columns: list[str],
+    export_format: ExportFormat,
+    name: str,
+    batch_size: int | None = None,
+) -> StreamingResponse:
+    """Stream `columns` of every `model` row as an attachment."""
+    rows = iter_rows(model, columns, batch_size or settings.EXPORT_BATCH_SIZE)
+    filename = f"{name}_{time.strftime('%Y-%m-%d_%H-%M-%S')}.{export_format}"
+    return StreamingResponse(
+        ENCODERS[export_format](columns, rows),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
@@ -0,0 +1,131 @@
+import email.utils
+import hashlib
+from datetime import UTC, datetime
+from typing import Any, Sequence
+
+from fastapi import Request, Response, status
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from models import Course, Enrollment, User
+
+# ── Conditional GET ──
+#
+# Handlers derive a strong ETag from the version columns of exactly what
+# they return (id + updated_at, plus anything that changes without
+# touching updated_at). A matching If-None-Match is answered with 304
+# before the response body is serialized; list endpoints can check it
+# with a column-only query before loading any rows at all.
+
+# Admin data must never be served stale: caches may store it but have to
+# revalidate every time, which is a 304 when nothing changed
+PRIVATE_REVALIDATE = "private, no-cache"
+
+# Public catalog data tolerates the same staleness as the server caches
+PUBLIC_CATALOG = f"public, max-age={settings.CATALOG_HTTP_MAX_AGE_SECONDS}"
+
+# Columns whose values identify a row's representation. Course counters
+# and enrollments can change without touching updated_at.
+USER_VERSION = (User.id, User.updated_at)
+COURSE_VERSION = (Course.id, Course.updated_at, Course.enrollment_count)
+ENROLLMENT_VERSION = (Enrollment.id, Enrollment.user_id, Enrollment.course_id)
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag over any reprs that identify one representation."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def versions(objects: Sequence, columns: Sequence) -> list[tuple]:
+    """The `columns` values of each loaded object, for make_etag()."""
+    return [tuple(getattr(obj, column.key) for column in columns) for obj in objects]
+
+
+def http_date(value: datetime) -> str:
+    """IMF-fixdate for a header; naive datetimes are taken as UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    return email.utils.format_datetime(value.astimezone(UTC), usegmt=True)
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/ prefixes are ignored."""
+    if header.strip() == "*":
+        return True
+    candidates = (candidate.strip().removeprefix("W/") for candidate in header.split(","))
+    return etag in candidates
+
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime | None = None) -> bool:
+    """Evaluate the request's validators; If-None-Match wins when present."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = email.utils.parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=UTC)
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=UTC)
+        # HTTP dates have one-second resolution
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def validators(etag: str, cache_control: str, last_modified: datetime | None = None) -> dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def conditional(
+    request: Request,
+    response: Response,
+    etag: str,
+    cache_control: str,
+    last_modified: datetime | None = None,
+) -> Response | None:
+    """
+    Return a 304 response if the client's copy is current. Otherwise set
+    the validators on `response` and return None so the handler carries
+    on and returns its body.
+    """
+    headers = validators(etag, cache_control, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+async def precheck(
+    request: Request,
+    db: AsyncSession,
+    stmt: Select,
+    columns: Sequence,
+    *variant: Any,
+    cache_control: str = PRIVATE_REVALIDATE,
+) -> Response | None:
+    """
+    For clients revalidating with If-None-Match, run `stmt` reduced to its
+    version `columns` and return a 304 if the ETag still matches, without
+    loading or serializing the rows. Must produce the same ETag as
+    make_etag(*variant, versions(objects, columns)) over the full result.
+    """
+    if "if-none-match" not in request.headers:
+        return None
+    rows = (await db.execute(stmt.with_only_columns(*columns))).all()
+    etag = make_etag(*variant, [tuple(row) for row in rows])
+    if is_not_modified(request, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers=validators(etag, cache_control),
+        )
+    return None
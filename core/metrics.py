@@ -0,0 +1,158 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+A deliberately small subset of the client-library model: counters,
+gauges and fixed-bucket histograms with labels, kept in memory per worker
+process and rendered by `render()` for the /metrics endpoint. Updates
+take a lock because Argon2 timings are recorded from the hashing threads.
+"""
+
+import math
+from bisect import bisect_left
+from threading import Lock
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; request latency and most DB waits fall in the low buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = labels
+        self._lock = Lock()
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.label_names, key)} {_number(value)}" for key, value in values]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: tuple[float, ...] = LATENCY_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(buckets) + (math.inf,)
+        # labels -> [per-bucket counts..., sum, count]
+        self._values: dict[tuple, list[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [0] * len(self.buckets) + [0.0, 0]
+            state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            values = sorted((key, list(state)) for key, state in self._values.items())
+        lines = []
+        for key, state in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                labels = _labels(self.label_names + ("le",), key + (_number(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_number(state[-2])}")
+            lines.append(f"{self.name}_count{labels} {state[-1]}")
+        return lines
+
+
+# ── Application Metrics ──
+
+http_requests = Counter(
+    "http_requests_total",
+    "HTTP requests completed, by route template and status code.",
+    ("method", "route", "status"),
+)
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the last response byte.",
+    ("method", "route"),
+)
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being handled.",
+)
+http_requests_in_flight.inc(amount=0)
+db_pool_checkout = Histogram(
+    "db_pool_checkout_seconds",
+    "Time to obtain a pooled DB connection: waiting for a free slot or opening one.",
+    ("pool",),
+)
+password_hash_duration = Histogram(
+    "password_hash_duration_seconds",
+    "Argon2 time per operation, measured in the hashing thread.",
+    ("operation",),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+cache_lookups = Counter(
+    "cache_lookups_total",
+    "In-process cache (core.cache) lookups, by cache and result: hit or miss.",
+    ("cache", "result"),
+)
+
+REGISTRY: list[Metric] = [
+    http_requests,
+    http_request_duration,
+    http_requests_in_flight,
+    db_pool_checkout,
+    password_hash_duration,
+    cache_lookups,
+]
+
+
+def render() -> str:
+    """Every registered metric in the Prometheus text format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.header())
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
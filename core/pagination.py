@@ -0,0 +1,57 @@
+import base64
+import json
+
+from fastapi import HTTPException, status
+
+# ── Keyset (cursor) Pagination ──
+#
+# Pages are ordered by primary key; the cursor is an opaque token wrapping
+# the last id of the previous page, so each page is an index range scan
+# (`WHERE id > :last_id ORDER BY id LIMIT :n`) no matter how deep it is.
+
+# Ids are 64-bit; anything larger would overflow the driver's binding
+MAX_ID = 2**63 - 1
+
+
+def encode_cursor(last_id: int) -> str:
+    """Build the opaque `next_cursor` token for a page ending at `last_id`."""
+    payload = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Return the last id wrapped in a cursor. Raises 400 if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded))["id"]
+        if not isinstance(last_id, int) or isinstance(last_id, bool) or not 0 <= last_id <= MAX_ID:
+            raise ValueError
+        return last_id
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        )
+
+
+def next_cursor(rows: list, limit: int) -> str | None:
+    """
+    Given up to `limit + 1` rows fetched in id order, trim the extra row
+    and return the cursor for the following page (None on the last page).
+    """
+    if len(rows) <= limit:
+        return None
+    del rows[limit:]
+    return encode_cursor(rows[-1].id)
+
+
+async def keyset_page(db, stmt, id_column, limit: int, after: str | None) -> tuple[list, str | None]:
+    """
+    Run `stmt` as one keyset page ordered by `id_column`.
+    Returns (rows, next_cursor).
+    """
+    stmt = stmt.order_by(id_column).limit(limit + 1)
+    if after is not None:
+        stmt = stmt.where(id_column > decode_cursor(after))
+    rows = list((await db.execute(stmt)).scalars().all())
+    return rows, next_cursor(rows, limit)
@@ -0,0 +1,129 @@
+"""
+SQL instrumentation through engine events.
+
+`instrument(engine)` times every statement the engine executes. While a
+request is being handled (QueryStatsMiddleware), each statement is also
+counted against that request's RequestQueries, held in a context
+variable, which gives the per-request query count and DB time for the
+Server-Timing header and the repeated-statement (N+1) check.
+
+Statements slower than SQL_SLOW_QUERY_MS are logged with their
+parameters (unless the engine hides them) and, for SELECTs, the
+database's query plan.
+"""
+
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+STARTED = "query_stats_started"
+
+# Longest statement text / parameter repr written to a log line
+LOG_TEXT_LIMIT = 2000
+
+
+class RequestQueries:
+    """Statements executed on behalf of one request."""
+
+    __slots__ = ("count", "duration", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        # statement text -> executions; the text is already parameterized,
+        # so each key is one statement shape
+        self.statements: Counter[str] = Counter()
+
+    def record(self, statement: str, elapsed: float, executemany: bool = False) -> None:
+        self.count += 1
+        self.duration += elapsed
+        # A batched insert sends one executemany per batch; that is not a
+        # query per row
+        if not executemany:
+            self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Statement shapes executed more than `threshold` times."""
+        return [(text, count) for text, count in self.statements.most_common() if count > threshold]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration * 1000:.1f};desc="{self.count} queries"'
+
+
+current_queries: ContextVar[RequestQueries | None] = ContextVar("current_queries", default=None)
+
+
+def shorten(text: str) -> str:
+    text = " ".join(text.split())
+    if len(text) <= LOG_TEXT_LIMIT:
+        return text
+    return text[:LOG_TEXT_LIMIT] + " ..."
+
+
+def explain(connection, statement: str, parameters) -> list[tuple]:
+    """
+    The plan of a SELECT, run on the raw DBAPI connection so that it is
+    neither instrumented itself nor disturbs the caller's cursor.
+    """
+    prefix = "EXPLAIN QUERY PLAN " if connection.dialect.name == "sqlite" else "EXPLAIN "
+    cursor = connection.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def log_slow_query(connection, statement: str, parameters, elapsed: float, executemany: bool) -> None:
+    params = "[hidden]" if connection.engine.hide_parameters else shorten(repr(parameters))
+    message = f"Slow query ({elapsed * 1000:.1f} ms): {shorten(statement)} | parameters: {params}"
+
+    is_select = statement.lstrip().upper().startswith(("SELECT", "WITH"))
+    if settings.SQL_EXPLAIN_SLOW_QUERIES and is_select and not executemany:
+        try:
+            plan = explain(connection, statement, parameters)
+        except Exception as exc:
+            message += f"\n  plan unavailable: {exc}"
+        else:
+            message += "".join(f"\n  {' | '.join(map(str, row))}" for row in plan)
+    logger.warning(message)
+
+
+def instrument(engine: Engine) -> None:
+    """Attach the timing hooks to a (sync) engine, e.g. async_engine.sync_engine."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(connection, cursor, statement, parameters, context, executemany):
+        connection.info.setdefault(STARTED, []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(connection, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - connection.info[STARTED].pop()
+        queries = current_queries.get()
+        if queries is not None:
+            queries.record(statement, elapsed, executemany)
+        if elapsed * 1000 >= settings.SQL_SLOW_QUERY_MS:
+            log_slow_query(connection, statement, parameters, elapsed, executemany)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        connection = exception_context.connection
+        if connection is not None and not connection.invalidated and connection.info.get(STARTED):
+            connection.info[STARTED].pop()
+
+
+def report_repeated(queries: RequestQueries, method: str, path: str) -> None:
+    """Warn about statement shapes that look like an N+1 pattern."""
+    for statement, count in queries.repeated(settings.SQL_REPEATED_QUERY_THRESHOLD):
+        logger.warning(
+            "Possible N+1: %s %s executed the same statement %d times: %s",
+            method, path, count, shorten(statement),
+        )
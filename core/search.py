@@ -0,0 +1,104 @@
+"""
+Full-text course search and substring user lookup.
+
+On SQLite, `courses_fts` is an external-content FTS5 index over
+courses.title/description kept in sync by triggers (see
+migrations.ensure_course_search), ranked with bm25. On PostgreSQL the same
+endpoint uses a GIN-indexed tsvector expression ranked with ts_rank.
+
+User input never reaches the MATCH/tsquery syntax directly: it is split
+into word tokens and each is quoted and turned into a prefix term, so
+"pyth begin" finds "Python for Beginners".
+
+User lookup matches substrings of username, email and names through a
+trigram index (`users_fts` on SQLite, pg_trgm on PostgreSQL). Trigrams
+need at least three characters, so shorter terms are dropped.
+"""
+
+import re
+
+from sqlalchemy import ColumnElement, Select, and_, column, func, literal_column, select, table
+
+from models import Course, User
+
+# Title hits count ten times as much as description hits
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+MAX_TERMS = 8
+
+MIN_TRIGRAM_TERM = 3
+
+courses_fts = table("courses_fts", column("rowid"))
+users_fts = table("users_fts", column("rowid"))
+
+# Must match the expressions of ix_courses_search / ix_users_search on
+# PostgreSQL exactly
+PG_DOCUMENT = "to_tsvector('simple', title || ' ' || coalesce(description, ''))"
+PG_USER_DOCUMENT = (
+    "lower(username || ' ' || email || ' ' || coalesce(first_name, '') || ' ' || "
+    "coalesce(last_name, ''))"
+)
+
+
+def search_terms(q: str) -> list[str]:
+    """Lower-cased word tokens of a search string, at most MAX_TERMS."""
+    return re.findall(r"\w+", q.lower())[:MAX_TERMS]
+
+
+def fts5_query(terms: list[str]) -> str:
+    """FTS5 MATCH expression: every term required, each as a prefix."""
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def tsquery(terms: list[str]) -> str:
+    """PostgreSQL to_tsquery() input: every term required, each as a prefix."""
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+def course_search_stmt(dialect: str, terms: list[str]) -> Select:
+    """Ranked SELECT of the courses matching all `terms`, best first."""
+    if dialect == "sqlite":
+        fts = literal_column("courses_fts")
+        return (
+            select(Course)
+            .join(courses_fts, courses_fts.c.rowid == Course.id)
+            .where(fts.op("MATCH")(fts5_query(terms)))
+            .order_by(func.bm25(fts, TITLE_WEIGHT, DESCRIPTION_WEIGHT), Course.id)
+        )
+
+    document = literal_column(PG_DOCUMENT)
+    query = func.to_tsquery("simple", tsquery(terms))
+    return (
+        select(Course)
+        .where(document.op("@@")(query))
+        .order_by(func.ts_rank(document, query).desc(), Course.id)
+    )
+
+
+def course_search_filter(dialect: str, terms: list[str]) -> ColumnElement[bool]:
+    """WHERE clause for the courses matching all `terms`, unranked."""
+    if dialect == "sqlite":
+        return Course.id.in_(
+            select(courses_fts.c.rowid).where(
+                literal_column("courses_fts").op("MATCH")(fts5_query(terms))
+            )
+        )
+    return literal_column(PG_DOCUMENT).op("@@")(func.to_tsquery("simple", tsquery(terms)))
+
+
+def trigram_terms(q: str) -> list[str]:
+    """Whitespace-separated, lower-cased terms long enough for a trigram index."""
+    return [term for term in q.lower().split() if len(term) >= MIN_TRIGRAM_TERM][:MAX_TERMS]
+
+
+def user_search_filter(dialect: str, terms: list[str]) -> ColumnElement[bool]:
+    """WHERE clause for users containing every term as a substring of any field."""
+    if dialect == "sqlite":
+        match = " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+        return User.id.in_(
+            select(users_fts.c.rowid).where(literal_column("users_fts").op("MATCH")(match))
+        )
+
+    document = literal_column(PG_USER_DOCUMENT)
+    return and_(*(document.contains(term, autoescape=True) for term in terms))
@@ -1,9 +1,20 @@
+import asyncio
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
 
 import jwt
 from pwdlib import PasswordHash
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.responses import Response
 
 from config import settings
+from core.metrics import password_hash_duration
+from database import dialect_insert
+from models import RevokedToken
 
 # ── Password Hashing (Argon2id) ──
 
@@ -12,12 +23,98 @@ password_hasher = PasswordHash.recommended()
 
 def hash_password(password: str) -> str:
     """Hash a plain-text password using Argon2id."""
-    return password_hasher.hash(password)
+    started = time.perf_counter()
+    try:
+        return password_hasher.hash(password)
+    finally:
+        password_hash_duration.observe(time.perf_counter() - started, "hash")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain-text password against a hash."""
-    return password_hasher.verify(plain_password, hashed_password)
+    started = time.perf_counter()
+    try:
+        return password_hasher.verify(plain_password, hashed_password)
+    finally:
+        password_hash_duration.observe(time.perf_counter() - started, "verify")
+
+
+# ── Async Hashing (bounded worker pool) ──
+
+class HashingPoolSaturated(RuntimeError):
+    """Raised when too many hash/verify jobs are already queued."""
+
+
+class HashingPool:
+    """
+    Runs Argon2 work on a dedicated thread pool so it never blocks the
+    event loop. argon2-cffi releases the GIL, so threads hash in parallel.
+
+    At most `workers + max_pending` jobs may be in flight; beyond that
+    `run()` raises HashingPoolSaturated instead of queueing unboundedly.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.in_flight = 0
+        self._executor: ThreadPoolExecutor | None = None
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.max_pending
+
+    async def run(self, fn, *args):
+        if self.in_flight >= self.capacity:
+            raise HashingPoolSaturated("Password hashing pool is saturated")
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="argon2",
+            )
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self.in_flight -= 1
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+hashing_pool = HashingPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the hashing pool. May raise HashingPoolSaturated."""
+    return await hashing_pool.run(hash_password, password)
+
+
+async def hash_passwords_async(passwords: list[str]) -> list[str]:
+    """
+    Hash many passwords in parallel, keeping at most `workers` jobs of this
+    batch in flight so one bulk import can't saturate the pool by itself.
+    """
+    slots = asyncio.Semaphore(hashing_pool.workers)
+
+    async def hash_one(password: str) -> str:
+        async with slots:
+            return await hash_password_async(password)
+
+    return list(await asyncio.gather(*(hash_one(p) for p in passwords)))
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing pool. May raise HashingPoolSaturated."""
+    return await hashing_pool.run(verify_password, plain_password, hashed_password)
 
 
 # ── JWT Tokens ──
@@ -38,3 +135,131 @@ def verify_access_token(token: str) -> dict | None:
         return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
     except jwt.PyJWTError:
         return None
+
+
+# ── Stateless Sessions ──
+
+ACCESS_COOKIE = "access_token"
+REFRESH_COOKIE = "refresh_token"
+
+# Revocation. Refresh tokens are revoked in the shared revoked_tokens
+# table, so every worker rejects them until they expire. Access tokens
+# are resolved without touching the database; a signed-out access token
+# is remembered by the worker that revoked it (jti -> exp), and other
+# workers accept it for at most ACCESS_TOKEN_EXPIRE_MINUTES, while its
+# refresh token can no longer extend the session anywhere.
+revoked_access_tokens: dict[str, float] = {}
+
+
+@dataclass(frozen=True, slots=True)
+class SessionUser:
+    """Identity carried in an access token — enough for templates, no DB row."""
+    id: int
+    username: str
+    first_name: str | None = None
+    last_name: str | None = None
+
+    @property
+    def display_name(self) -> str:
+        full_name = " ".join(filter(None, [self.first_name, self.last_name]))
+        return full_name or self.username
+
+
+def create_session_tokens(user) -> tuple[str, str]:
+    """Issue an (access, refresh) token pair for a user."""
+    access_token = create_access_token({
+        "sub": str(user.id),
+        "type": "access",
+        "jti": uuid.uuid4().hex,
+        "username": user.username,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+    })
+    refresh_token = create_access_token(
+        {"sub": str(user.id), "type": "refresh", "jti": uuid.uuid4().hex},
+        expires_delta=timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    )
+    return access_token, refresh_token
+
+
+def set_token_cookies(response: Response, access_token: str, refresh_token: str) -> None:
+    """Store a session token pair in the response's cookies."""
+    response.set_cookie(
+        key=ACCESS_COOKIE,
+        value=access_token,
+        max_age=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        httponly=True,
+        samesite="lax",
+    )
+    response.set_cookie(
+        key=REFRESH_COOKIE,
+        value=refresh_token,
+        max_age=settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60,
+        httponly=True,
+        samesite="lax",
+    )
+
+
+def decode_session_token(token: str, token_type: str) -> dict | None:
+    """Verify a session token of the given type. Returns payload or None."""
+    payload = verify_access_token(token)
+    if payload is None or payload.get("type") != token_type:
+        return None
+    if token_type == "access" and payload.get("jti") in revoked_access_tokens:
+        return None
+    return payload
+
+
+def session_user_from_token(token: str) -> SessionUser | None:
+    """Resolve the identity in an access token without touching the database."""
+    payload = decode_session_token(token, "access")
+    if payload is None:
+        return None
+    try:
+        return SessionUser(
+            id=int(payload["sub"]),
+            username=payload["username"],
+            first_name=payload.get("first_name"),
+            last_name=payload.get("last_name"),
+        )
+    except (KeyError, ValueError):
+        return None
+
+
+def forget_expired_access_tokens(now: float) -> None:
+    for jti in [jti for jti, exp in revoked_access_tokens.items() if exp <= now]:
+        del revoked_access_tokens[jti]
+
+
+async def claim_refresh_token(db: AsyncSession, payload: dict) -> bool:
+    """
+    Record a refresh token's jti as used. Returns False if it already was:
+    the insert is the single-use check, so concurrent refreshes with the
+    same token in different workers can't both succeed. Expired rows are
+    purged in the same transaction.
+    """
+    expires_at = datetime.fromtimestamp(payload["exp"], UTC)
+    await db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= datetime.now(UTC)))
+    result = await db.execute(
+        dialect_insert(db.bind.dialect.name, RevokedToken)
+        .values(jti=payload["jti"], expires_at=expires_at)
+        .on_conflict_do_nothing(index_elements=[RevokedToken.jti])
+        .returning(RevokedToken.jti)
+    )
+    claimed = result.scalar_one_or_none() is not None
+    await db.commit()
+    return claimed
+
+
+async def revoke_token(db: AsyncSession, token: str) -> dict | None:
+    """Revoke a session token until it expires. Returns its payload."""
+    payload = verify_access_token(token)
+    if not payload or not payload.get("jti") or "exp" not in payload:
+        return payload
+    if payload.get("type") == "refresh":
+        await claim_refresh_token(db, payload)
+    else:
+        now = time.time()
+        forget_expired_access_tokens(now)
+        revoked_access_tokens[payload["jti"]] = payload["exp"]
+    return payload
@@ -1,17 +1,165 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession, 
     async_sessionmaker, 
     create_async_engine
 )
 
+from config import settings
+from core.metrics import db_pool_checkout
+from core.query_stats import instrument
+from migrations import drop_search_indexes, run_migrations
 from models import Base
 
-SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./codeatlas.db"
+SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
+SQLALCHEMY_READ_DATABASE_URL = settings.DATABASE_READ_URL or SQLALCHEMY_DATABASE_URL
 
-engine = create_async_engine(
-    SQLALCHEMY_DATABASE_URL, 
-    connect_args={"check_same_thread": False}
-)
+
+def is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def is_memory_sqlite(url: str) -> bool:
+    return is_sqlite(url) and make_url(url).database in (None, "", ":memory:")
+
+
+def sqlite_pragmas(read_only: bool = False) -> list[str]:
+    """
+    Per-connection PRAGMAs from the SQLite tuning profile in config.Settings.
+    journal_mode is persistent in the file, so only the writer sets it.
+    """
+    pragmas = [
+        f"PRAGMA busy_timeout = {settings.SQLITE_BUSY_TIMEOUT_MS}",
+        f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA cache_size = -{settings.SQLITE_CACHE_SIZE_KB}",
+        f"PRAGMA mmap_size = {settings.SQLITE_MMAP_SIZE}",
+        f"PRAGMA temp_store = {settings.SQLITE_TEMP_STORE}",
+        "PRAGMA foreign_keys = ON",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only = ON")
+    else:
+        pragmas.insert(0, f"PRAGMA journal_mode = {settings.SQLITE_JOURNAL_MODE}")
+    return pragmas
+
+
+def postgres_connect_args(read_only: bool = False) -> dict:
+    """asyncpg connect() arguments from the PostgreSQL settings."""
+    server_settings = {
+        "application_name": settings.DB_APPLICATION_NAME,
+        "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS),
+    }
+    if read_only:
+        server_settings["default_transaction_read_only"] = "on"
+    return {
+        "prepared_statement_cache_size": settings.PG_PREPARED_STATEMENT_CACHE_SIZE,
+        "server_settings": server_settings,
+    }
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long each checkout takes in
+    core.metrics.db_pool_checkout, labelled with the pool's logging name.
+    """
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            pool_name = getattr(self, "logging_name", None) or "default"
+            db_pool_checkout.observe(time.perf_counter() - started, pool_name)
+
+
+def make_engine(url: str, *, read_only: bool = False, tuned: bool = True) -> AsyncEngine:
+    """
+    Build an async engine for `url`, configured for its dialect.
+
+    SQLite: with `tuned`, connections get the PRAGMA profile on connect and
+    the writer pool is kept small (DB_WRITE_POOL_SIZE, one by default) so
+    writes in a worker queue on the pool instead of failing with
+    "database is locked", while readers get their own larger pool.
+
+    PostgreSQL (postgresql+asyncpg): writers use DB_POOL_SIZE, readers
+    DB_READ_POOL_SIZE; every connection carries a statement timeout and
+    asyncpg's prepared statement cache size, and reader connections
+    default to read-only transactions.
+    """
+    if is_sqlite(url):
+        if not tuned:
+            return create_async_engine(url, connect_args={"check_same_thread": False})
+        if is_memory_sqlite(url):
+            # Single shared connection (StaticPool); pool sizing doesn't apply
+            return create_async_engine(url, connect_args={"check_same_thread": False})
+
+        if read_only:
+            pool_size, max_overflow = settings.DB_READ_POOL_SIZE, settings.DB_READ_MAX_OVERFLOW
+        else:
+            pool_size, max_overflow = settings.DB_WRITE_POOL_SIZE, settings.DB_WRITE_MAX_OVERFLOW
+        connect_args = {"check_same_thread": False}
+    else:
+        if read_only:
+            pool_size, max_overflow = settings.DB_READ_POOL_SIZE, settings.DB_READ_MAX_OVERFLOW
+        else:
+            pool_size, max_overflow = settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW
+        connect_args = postgres_connect_args(read_only)
+
+    new_engine = create_async_engine(
+        url,
+        connect_args=connect_args,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        poolclass=InstrumentedPool,
+        pool_logging_name="read" if read_only else "write",
+    )
+
+    if is_sqlite(url):
+        pragmas = sqlite_pragmas(read_only)
+
+        @event.listens_for(new_engine.sync_engine, "connect")
+        def _apply_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for pragma in pragmas:
+                cursor.execute(pragma)
+            cursor.close()
+
+    return new_engine
+
+
+def dialect_insert(dialect: str, model):
+    """
+    INSERT construct of `dialect` (e.g. db.bind.dialect.name), which
+    supports .on_conflict_do_nothing() / .on_conflict_do_update() for upserts.
+    """
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert(model)
+
+
+# Writer: all sessions that may INSERT/UPDATE/DELETE
+engine = make_engine(SQLALCHEMY_DATABASE_URL)
+# Readers: read-only connections for GET handlers and identity lookups,
+# optionally pointed at a replica through DATABASE_READ_URL
+if is_memory_sqlite(SQLALCHEMY_READ_DATABASE_URL):
+    read_engine = engine
+else:
+    read_engine = make_engine(SQLALCHEMY_READ_DATABASE_URL, read_only=True)
+
+# Query timing, slow-query log and per-request statistics (core.query_stats)
+instrument(engine.sync_engine)
+if read_engine is not engine:
+    instrument(read_engine.sync_engine)
 
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -19,6 +167,12 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False
 )
 
+ReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+)
+
 # Dependency to get database session
 async def get_db():
     """
@@ -31,14 +185,28 @@ async def get_db():
         finally:
             await session.close()
 
+# Dependency to get a read-only database session
+async def get_read_db():
+    """
+    FastAPI dependency that provides a read-only database session
+    from the reader pool. Writes through it fail.
+    Usage: db: AsyncSession = Depends(get_read_db)
+    """
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
 # Create tables
 async def create_tables():
     """
-    Create all tables defined in models.
+    Create all tables defined in models and upgrade existing ones.
     Call this on application startup.
     """
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(run_migrations)
 
 # Drop all tables (useful for testing/development)
 async def drop_tables():
@@ -46,7 +214,14 @@ async def drop_tables():
     Drop all tables. Use with caution!
     """
     async with engine.begin() as conn:
+        await conn.run_sync(drop_search_indexes)
         await conn.run_sync(Base.metadata.drop_all)
 
-
-
+# Release pooled connections
+async def dispose_engines():
+    """
+    Close every pooled connection. Call this on application shutdown.
+    """
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
@@ -1,39 +1,71 @@
+import secrets
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request
-from database import create_tables, engine
-from middleware import AuthMiddleware
+from fastapi import FastAPI, HTTPException, Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+from config import settings
+from core import metrics
+from core.catalog import get_catalog
+from core.security import HashingPoolSaturated, hashing_pool
+from database import create_tables, dispose_engines, engine
+from middleware import (
+    AuthMiddleware,
+    CompressionMiddleware,
+    CurrentUser,
+    MetricsMiddleware,
+    QueryStatsMiddleware,
+)
 from admin import create_admin
 from routers.api.admin import (
     user as admin_router,
     course as admin_course_router,
+    enrollment as admin_enrollment_router,
+    export as admin_export_router,
+)
+from routers.api import (
+    course as course_router,
 )
 from routers.web import (
     users as web_users_router,
 )
 
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
+from core.assets import AssetFiles
+from templating import templates
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await create_tables()
     yield
-    await engine.dispose()
+    await dispose_engines()
+    hashing_pool.shutdown()
 app = FastAPI(
     lifespan=lifespan
 )
 
+
+@app.exception_handler(HashingPoolSaturated)
+async def hashing_pool_saturated_handler(request: Request, exc: HashingPoolSaturated):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
 app.add_middleware(AuthMiddleware)
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 # Admin panel — must be mounted BEFORE /static to avoid route shadowing
 admin = create_admin(app, engine)
 
-app.mount("/static", StaticFiles(directory="static"), name="static")
-templates = Jinja2Templates(directory="templates")
+app.mount("/static", AssetFiles(directory="static"), name="static")
 
 
 app.include_router(admin_router.router)
 app.include_router(admin_course_router.router)
+app.include_router(admin_enrollment_router.router)
+app.include_router(admin_export_router.router)
+app.include_router(course_router.router)
 app.include_router(web_users_router.router)
 
 
@@ -42,5 +74,22 @@ def main():
 
 
 @app.get("/")
-async def home(request: Request):
-    return templates.TemplateResponse("base.html", {"request": request, "user": request.state.user})
+async def home(request: Request, user: CurrentUser):
+    return templates.TemplateResponse(
+        request, "base.html", {"user": user, "catalog": await get_catalog()}
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint(request: Request):
+    """Prometheus scrape target for this worker's core.metrics."""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if settings.METRICS_TOKEN:
+        expected = f"Bearer {settings.METRICS_TOKEN}".encode()
+        if not secrets.compare_digest(request.headers.get("authorization", "").encode(), expected):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
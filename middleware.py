@@ -1,31 +1,366 @@
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+import time
+from typing import Annotated
+
+from fastapi import Depends, Request
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.responses import Response
+from starlette.routing import Mount
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from database import AsyncSessionLocal
+from config import settings
+from core.assets import accepted_encodings
+from core.cache import user_cache
+from core.compression import ENCODERS, choose_encoding
+from core.metrics import http_request_duration, http_requests, http_requests_in_flight
+from core.query_stats import RequestQueries, current_queries, report_repeated
+from core.security import (
+    ACCESS_COOKIE,
+    REFRESH_COOKIE,
+    SessionUser,
+    claim_refresh_token,
+    create_session_tokens,
+    decode_session_token,
+    session_user_from_token,
+    set_token_cookies,
+)
+from database import AsyncSessionLocal, ReadSessionLocal
 from models import User
 
 
-class AuthMiddleware(BaseHTTPMiddleware):
+class LazyUser:
     """
-    Reads 'user_id' cookie on every request.
-    If valid, attaches User object to request.state.user.
-    Templates can then use {% if user %} conditionals.
+    Deferred lookup of the user behind a session cookie.
+
+    Nothing is queried or decoded until the first `await lazy_user.get()`
+    (or `await lazy_user`); the result is memoized for the rest of the
+    request. A `token` resolves to a SessionUser from its claims alone,
+    a `user_id` to the User row.
+
+    When the access token is missing or expired and a `refresh_token` is
+    given, the session is rotated instead: the new (access, refresh) pair
+    is kept in `tokens` for AuthMiddleware to send back as cookies.
     """
 
-    async def dispatch(self, request: Request, call_next):
-        request.state.user = None
+    __slots__ = ("user_id", "token", "refresh_token", "tokens", "_user", "_resolved")
 
-        user_id = request.cookies.get("user_id")
-        if user_id:
+    def __init__(self, user_id: int | None = None, token: str | None = None, refresh_token: str | None = None):
+        self.user_id = user_id
+        self.token = token
+        self.refresh_token = refresh_token
+        self.tokens: tuple[str, str] | None = None
+        self._user: User | SessionUser | None = None
+        self._resolved = user_id is None and token is None and refresh_token is None
+
+    async def get(self) -> User | SessionUser | None:
+        if not self._resolved:
             try:
-                async with AsyncSessionLocal() as db:
-                    result = await db.execute(
-                        select(User).where(User.id == int(user_id))
-                    )
-                    request.state.user = result.scalars().first()
-            except (ValueError, Exception):
-                pass
-
-        response = await call_next(request)
-        return response
+                if self.token is not None:
+                    self._user = session_user_from_token(self.token)
+                elif self.user_id is not None:
+                    self._user = await load_user(self.user_id)
+                if self._user is None and self.refresh_token is not None:
+                    await self._refresh()
+            except Exception:
+                self._user = None
+            self._resolved = True
+        return self._user
+
+    async def _refresh(self) -> None:
+        async with AsyncSessionLocal() as db:
+            session = await rotate_session(db, self.refresh_token)
+        if session is not None:
+            _, access_token, refresh_token = session
+            self.tokens = (access_token, refresh_token)
+            self._user = session_user_from_token(access_token)
+
+    def __await__(self):
+        return self.get().__await__()
+
+
+async def load_user(user_id: int) -> User | None:
+    """Fetch a user by id, going through `core.cache.user_cache`."""
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+
+    async with ReadSessionLocal() as db:
+        result = await db.execute(
+            select(User).where(User.id == user_id)
+        )
+        user = result.scalars().first()
+
+    if user is not None:
+        user_cache.set(user_id, user)
+    return user
+
+
+async def rotate_session(db: AsyncSession, refresh_token: str) -> tuple[User, str, str] | None:
+    """
+    Spend a refresh token on a new (user, access token, refresh token).
+    None if the token is invalid, expired or already used: refresh tokens
+    are single use in every worker (core.security.claim_refresh_token).
+    """
+    payload = decode_session_token(refresh_token, "refresh")
+    if payload is None or not await claim_refresh_token(db, payload):
+        return None
+    user = await load_user(int(payload["sub"]))
+    if user is None:
+        return None
+    return user, *create_session_tokens(user)
+
+
+def token_cookie_headers(access_token: str, refresh_token: str) -> list[str]:
+    """The Set-Cookie header values set_token_cookies() would send."""
+    response = Response()
+    set_token_cookies(response, access_token, refresh_token)
+    return response.headers.getlist("set-cookie")
+
+
+class AuthMiddleware:
+    """
+    Reads the session cookie ('user_id', or 'access_token' when
+    SESSION_MODE is "jwt") and attaches a `LazyUser` to
+    request.state.auth. The database is only hit if a handler actually
+    resolves it, usually through the `CurrentUser` dependency.
+
+    In jwt mode an expired access cookie is renewed transparently: if the
+    handler resolves the user and the refresh cookie is still valid, the
+    refresh token is rotated and the new pair is set on the response, so
+    sessions last REFRESH_TOKEN_EXPIRE_DAYS without client-side code. Of
+    concurrent requests carrying the same spent refresh token only the
+    first is renewed; the others are served signed out and leave the
+    cookies to the first response.
+
+    Paths under `skip_prefixes` (static assets, JSON admin API, docs)
+    are passed straight through without touching the cookie at all.
+    """
+
+    def __init__(self, app: ASGIApp, skip_prefixes: list[str] | None = None):
+        self.app = app
+        if skip_prefixes is None:
+            skip_prefixes = settings.AUTH_SKIP_PATH_PREFIXES
+        self.skip_prefixes = tuple(skip_prefixes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"].startswith(self.skip_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        cookies = HTTPConnection(scope).cookies
+        if settings.SESSION_MODE == "jwt":
+            lazy_user = LazyUser(
+                token=cookies.get(ACCESS_COOKIE) or None,
+                refresh_token=cookies.get(REFRESH_COOKIE) or None,
+            )
+        else:
+            user_id = cookies.get("user_id")
+            try:
+                lazy_user = LazyUser(user_id=int(user_id) if user_id else None)
+            except ValueError:
+                lazy_user = LazyUser()
+
+        async def send_with_session(message: Message) -> None:
+            if message["type"] == "http.response.start" and lazy_user.tokens is not None:
+                headers = MutableHeaders(scope=message)
+                # A handler that sets the session itself (login) wins
+                if not any(value.startswith(f"{ACCESS_COOKIE}=") for value in headers.getlist("set-cookie")):
+                    for value in token_cookie_headers(*lazy_user.tokens):
+                        headers.append("set-cookie", value)
+            await send(message)
+
+        scope.setdefault("state", {})["auth"] = lazy_user
+        await self.app(scope, receive, send_with_session)
+
+
+class CompressionMiddleware:
+    """
+    Compresses HTML, JSON and other text responses with the best coding
+    the client accepts (br, zstd, gzip; see core.compression).
+
+    Whole bodies under `minimum_size` bytes are sent as-is. Streamed bodies
+    are compressed chunk by chunk and flushed after each one. Responses
+    that are already encoded (precompressed static files) or marked
+    `Cache-Control: no-transform` pass through untouched.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int | None = None,
+        media_types: list[str] | None = None,
+    ):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MIN_SIZE if minimum_size is None else minimum_size
+        self.media_types = frozenset(media_types or settings.COMPRESSION_MEDIA_TYPES)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        coding = choose_encoding(accepted_encodings(Headers(scope=scope)))
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        encoder = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, encoder, passthrough
+
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if encoder is None:
+                headers = MutableHeaders(raw=start["headers"])
+                if not self.should_compress(start["status"], headers, body, more_body):
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+
+                encoder = ENCODERS[coding]()
+                headers["Content-Encoding"] = coding
+                headers.add_vary_header("Accept-Encoding")
+                # Byte-for-byte identity no longer holds, equivalence does
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = "W/" + etag
+                del headers["Content-Length"]
+
+                data = encoder.encode(body, final=not more_body)
+                if not more_body:
+                    headers["Content-Length"] = str(len(data))
+                await send(start)
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+                return
+
+            data = encoder.encode(body, final=not more_body)
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+    def should_compress(self, status: int, headers: MutableHeaders, body: bytes, more_body: bool) -> bool:
+        if status < 200 or status in (204, 304):
+            return False
+        if "content-encoding" in headers or "no-transform" in headers.get("cache-control", ""):
+            return False
+        media_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+        if media_type not in self.media_types:
+            return False
+        if more_body:
+            length = headers.get("content-length")
+            return length is None or int(length) >= self.minimum_size
+        return len(body) >= self.minimum_size
+
+
+class MetricsMiddleware:
+    """
+    Records request count, status and latency per route template, plus
+    the number of requests in flight (see core.metrics).
+
+    Routes are labelled by their path template ("/api/admin/users/{user_id}"),
+    mounted apps by their mount path, and unmatched paths as "<unmatched>",
+    so label cardinality stays bounded by the route table.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        root_path = scope.get("root_path", "")
+        status = 500
+
+        async def send_tracked(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_tracked)
+        finally:
+            http_requests_in_flight.dec()
+            route = route_label(scope, root_path)
+            http_requests.inc(scope["method"], route, str(status))
+            http_request_duration.observe(time.perf_counter() - started, scope["method"], route)
+
+
+class QueryStatsMiddleware:
+    """
+    Collects the SQL executed while handling a request (core.query_stats),
+    including AuthMiddleware's and SQLAdmin's queries when installed
+    outside them. With SQL_SERVER_TIMING on, the count and DB time up to the start of
+    the response are sent as a Server-Timing header; once the response is
+    complete, statements repeated past SQL_REPEATED_QUERY_THRESHOLD are
+    logged as likely N+1 patterns.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        queries = RequestQueries()
+        token = current_queries.set(queries)
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start" and settings.SQL_SERVER_TIMING:
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", queries.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_queries.reset(token)
+            report_repeated(queries, scope["method"], scope["path"])
+
+
+def route_label(scope: Scope, root_path: str) -> str:
+    """Path template of the route that handled the request."""
+    # Mounted apps extend root_path by their mount point
+    prefix = scope.get("root_path", "")[len(root_path):]
+    route = scope.get("route")
+    if route is None:
+        return prefix or "<unmatched>"
+    if isinstance(route, Mount):
+        return prefix or route.path
+    return prefix + getattr(route, "path", "")
+
+
+# ── Dependencies ──
+
+async def get_current_user(request: Request) -> User | SessionUser | None:
+    """
+    FastAPI dependency resolving the signed-in user, or None.
+    Usage: user: CurrentUser
+    """
+    lazy_user = getattr(request.state, "auth", None)
+    if lazy_user is None:
+        return None
+    return await lazy_user.get()
+
+
+CurrentUser = Annotated[User | SessionUser | None, Depends(get_current_user)]
@@ -0,0 +1,250 @@
+"""
+Schema upgrades for databases created by an older version of the models.
+
+`Base.metadata.create_all` only creates missing tables, so anything added
+to an existing table (indexes, columns) is applied here. Every step is
+idempotent and runs on startup after create_all.
+"""
+
+import logging
+
+from sqlalchemy import Connection, delete, func, insert, inspect, select, text, update
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.exc import IntegrityError
+
+from core.enrollment_counts import reconcile_enrollment_counts_sync
+from models import Base, Course, Enrollment
+
+logger = logging.getLogger(__name__)
+
+# The catalog base.html used to hard-code, by Course.language slug
+CATALOG_COURSES: dict[str, list[tuple[str, str]]] = {
+    "c": [
+        ("C Programming for Beginners", "Master the fundamentals of C from scratch."),
+        ("Advanced C Concepts", "Pointers, memory management, and file I/O."),
+        ("Data Structures in C", "Implement linked lists, stacks, queues, and trees."),
+        ("C Projects & Practice", "Build real projects to solidify your skills."),
+    ],
+    "cpp": [
+        ("C++ Fundamentals", "Learn modern C++ from the ground up."),
+        ("Object-Oriented C++", "Classes, inheritance, polymorphism, and more."),
+        ("STL & Templates", "Master the Standard Template Library."),
+        ("Competitive Programming in C++", "Problem-solving techniques and algorithms."),
+    ],
+    "csharp": [
+        ("C# for Beginners", "Introduction to C# and the .NET ecosystem."),
+        ("C# Object-Oriented Programming", "Deep dive into OOP with C# examples."),
+        ("C# & .NET Core", "Build cross-platform apps with .NET Core."),
+        ("C# Desktop Applications", "Create WinForms and WPF applications."),
+    ],
+    "python": [
+        ("Python for Beginners", "Start your programming journey with Python."),
+        ("Intermediate Python", "Decorators, generators, and advanced concepts."),
+        ("Python OOP", "Object-oriented programming in Python."),
+        ("Python Automation & Scripting", "Automate tasks and build useful scripts."),
+    ],
+    "java": [
+        ("Java for Beginners", "Learn Java syntax, data types, and control flow."),
+        ("Java OOP Masterclass", "Interfaces, abstract classes, and design patterns."),
+        ("Java Collections Framework", "Lists, maps, sets, and iterators in depth."),
+        ("Java Multithreading", "Concurrency, threads, and synchronization."),
+    ],
+    "go": [
+        ("Go for Beginners", "Get started with Go and its toolchain."),
+        ("Go Concurrency Patterns", "Goroutines, channels, and sync primitives."),
+        ("Building REST APIs in Go", "Create production-ready APIs with Go."),
+        ("Go Projects", "Hands-on projects to master Go."),
+    ],
+    "rust": [
+        ("Rust for Beginners", "Ownership, borrowing, and lifetimes explained."),
+        ("Rust Systems Programming", "Low-level programming with memory safety."),
+        ("Rust Web Development", "Build web services with Actix and Rocket."),
+        ("Rust & WebAssembly", "Compile Rust to Wasm for the browser."),
+    ],
+    "javascript": [
+        ("JavaScript Fundamentals", "Variables, functions, and DOM manipulation."),
+        ("Modern JavaScript (ES6+)", "Arrow functions, destructuring, and modules."),
+        ("Asynchronous JavaScript", "Promises, async/await, and fetch API."),
+        ("JavaScript Projects", "Build interactive apps from scratch."),
+    ],
+}
+
+
+def ensure_indexes(conn: Connection) -> None:
+    """Create any index declared on the models that the database lacks."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                with conn.begin_nested():
+                    # IF NOT EXISTS: reflection can't see expression indexes
+                    conn.execute(CreateIndex(index, if_not_exists=True))
+            except IntegrityError:
+                logger.error(
+                    "Could not create unique index %s: existing rows in %s "
+                    "violate it. Resolve the duplicates and restart.",
+                    index.name, table.name,
+                )
+
+
+def dedupe_enrollments(conn: Connection) -> None:
+    """
+    Keep the oldest row of each duplicated (user_id, course_id) pair so
+    the unique index can be built. Skipped once the index exists.
+    """
+    existing = {index["name"] for index in inspect(conn).get_indexes("enrollments")}
+    if "uq_enrollments_user_course" in existing:
+        return
+
+    keep = (
+        select(func.min(Enrollment.id))
+        .group_by(Enrollment.user_id, Enrollment.course_id)
+        .scalar_subquery()
+    )
+    result = conn.execute(delete(Enrollment).where(Enrollment.id.not_in(keep)))
+    if result.rowcount:
+        logger.warning("Removed %d duplicate enrollment rows", result.rowcount)
+
+
+def add_enrollment_count(conn: Connection) -> None:
+    """Add courses.enrollment_count and fill it from the enrollments table."""
+    columns = {column["name"] for column in inspect(conn).get_columns("courses")}
+    if "enrollment_count" in columns:
+        return
+
+    conn.execute(text(
+        "ALTER TABLE courses ADD COLUMN enrollment_count INTEGER NOT NULL DEFAULT 0"
+    ))
+    reconcile_enrollment_counts_sync(conn)
+
+
+def add_course_language(conn: Connection) -> None:
+    """Add courses.language; existing courses stay out of the catalog until set."""
+    columns = {column["name"] for column in inspect(conn).get_columns("courses")}
+    if "language" in columns:
+        return
+
+    conn.execute(text("ALTER TABLE courses ADD COLUMN language VARCHAR(50)"))
+
+
+def seed_catalog(conn: Connection) -> None:
+    """
+    Publish CATALOG_COURSES: tag courses that already have one of those
+    titles with its language and insert the rest. Skipped once any course
+    has a language, so later edits in the admin are left alone.
+    """
+    if conn.execute(select(Course.id).where(Course.language.is_not(None)).limit(1)).first():
+        return
+
+    existing = dict(conn.execute(select(func.lower(Course.title), Course.id)).all())
+    new_rows = []
+    for language, courses in CATALOG_COURSES.items():
+        for title, description in courses:
+            course_id = existing.get(title.lower())
+            if course_id is None:
+                new_rows.append({"title": title, "description": description, "language": language})
+            else:
+                conn.execute(update(Course).where(Course.id == course_id).values(language=language))
+    if new_rows:
+        conn.execute(insert(Course), new_rows)
+        logger.info("Added %d catalog courses", len(new_rows))
+
+
+def fts_triggers(table: str, fts: str, columns: list[str]) -> dict[str, str]:
+    """Triggers that keep an external-content FTS5 table in step with `table`."""
+    names = ", ".join(columns)
+    old = ", ".join(f"old.{column}" for column in columns)
+    new = ", ".join(f"new.{column}" for column in columns)
+    return {
+        f"{fts}_ai": f"""
+            CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN
+                INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new});
+            END""",
+        f"{fts}_ad": f"""
+            CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN
+                INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old});
+            END""",
+        f"{fts}_au": f"""
+            CREATE TRIGGER {fts}_au AFTER UPDATE OF {names} ON {table} BEGIN
+                INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old});
+                INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new});
+            END""",
+    }
+
+
+def ensure_fts(conn: Connection, table: str, fts: str, columns: list[str], options: str) -> None:
+    """
+    Create the SQLite FTS5 index `fts` over `table`.`columns` and its sync
+    triggers. A newly created index is filled from the rows already there.
+    """
+    existing = set(conn.execute(
+        text("SELECT name FROM sqlite_master WHERE name = :fts OR type = 'trigger'"),
+        {"fts": fts},
+    ).scalars())
+
+    if fts not in existing:
+        conn.execute(text(
+            f"CREATE VIRTUAL TABLE {fts} USING fts5("
+            f"{', '.join(columns)}, content='{table}', content_rowid='id', {options})"
+        ))
+        conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+
+    for name, ddl in fts_triggers(table, fts, columns).items():
+        if name not in existing:
+            conn.execute(text(ddl))
+
+
+def ensure_course_search(conn: Connection) -> None:
+    """
+    Build the full-text index used by core.search: an FTS5 table plus sync
+    triggers on SQLite, a GIN expression index on PostgreSQL.
+    """
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_courses_search ON courses "
+            "USING gin (to_tsvector('simple', title || ' ' || coalesce(description, '')))"
+        ))
+        return
+
+    ensure_fts(
+        conn, "courses", "courses_fts", ["title", "description"],
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3'",
+    )
+
+
+def ensure_user_search(conn: Connection) -> None:
+    """
+    Build the substring index used by core.search for user lookups: an
+    FTS5 trigram table on SQLite, a pg_trgm GIN expression index on
+    PostgreSQL.
+    """
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_users_search ON users USING gin (lower("
+            "username || ' ' || email || ' ' || coalesce(first_name, '') || ' ' || "
+            "coalesce(last_name, '')) gin_trgm_ops)"
+        ))
+        return
+
+    ensure_fts(
+        conn, "users", "users_fts", ["username", "email", "first_name", "last_name"],
+        "tokenize='trigram'",
+    )
+
+
+def drop_search_indexes(conn: Connection) -> None:
+    """Remove the SQLite FTS tables, which drop_all does not know about."""
+    if conn.dialect.name == "sqlite":
+        conn.execute(text("DROP TABLE IF EXISTS courses_fts"))
+        conn.execute(text("DROP TABLE IF EXISTS users_fts"))
+
+
+def run_migrations(conn: Connection) -> None:
+    """Apply all upgrade steps in order."""
+    dedupe_enrollments(conn)
+    add_enrollment_count(conn)
+    add_course_language(conn)
+    ensure_indexes(conn)
+    ensure_course_search(conn)
+    ensure_user_search(conn)
+    seed_catalog(conn)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 from datetime import UTC, datetime
-from sqlalchemy import Integer, String, DateTime, ForeignKey
+from sqlalchemy import Integer, String, DateTime, ForeignKey, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, DeclarativeBase, relationship
 
 class Base(DeclarativeBase):
@@ -32,14 +32,23 @@ class User(Base):
     first_name: Mapped[str] = mapped_column(String(70), nullable=True)
     last_name: Mapped[str] = mapped_column(String(100), nullable=True)
 
+    # Enrollment rows are removed by ON DELETE CASCADE / an explicit bulk
+    # DELETE, never loaded into memory just to be deleted
     enrollments: Mapped[list[Enrollment]] = relationship(
         "Enrollment", 
-        back_populates="user"
+        back_populates="user",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
     def __repr__(self):
         return f"<User(id={self.id}, username='{self.username}', email='{self.email}')>"
 
+
+# Case-insensitive uniqueness; serves every func.lower(...) == ... lookup
+Index("ix_users_username_lower", func.lower(User.username), unique=True)
+Index("ix_users_email_lower", func.lower(User.email), unique=True)
+
  
 class Course(Base):
     __tablename__ = "courses"
@@ -61,28 +70,53 @@ class Course(Base):
     # Required fields
     title: Mapped[str] = mapped_column(String, nullable=False)
     description: Mapped[str] = mapped_column(String, nullable=True)
+    # Catalog grouping on the home page, a slug such as "python" (see core.catalog)
+    language: Mapped[str] = mapped_column(String(50), nullable=True, index=True)
+
+    # Denormalized; maintained on enroll/unenroll (see core.enrollment_counts)
+    enrollment_count: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        server_default="0",
+        nullable=False
+    )
     
     enrollments: Mapped[list[Enrollment]] = relationship(
         "Enrollment", 
-        back_populates="course"
+        back_populates="course",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     ) 
     
     def __repr__(self):
         return f"<Course(id={self.id}, title='{self.title}')>"
+
+
+Index("ix_courses_title_lower", func.lower(Course.title), unique=True)
+# Popularity ranking: ORDER BY enrollment_count DESC, id
+Index("ix_courses_enrollment_count", Course.enrollment_count.desc(), Course.id)
     
 
 class Enrollment(Base):
     __tablename__ = "enrollments"
+    __table_args__ = (
+        # One row per (user, course). Its leading column also serves as the
+        # user_id index ("courses of a user", "is this user enrolled").
+        Index("uq_enrollments_user_course", "user_id", "course_id", unique=True),
+        # Newest-first listing (the admin default sort)
+        Index("ix_enrollments_enrolled_at", "enrolled_at"),
+    )
 
     # auto-generated
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(
-        ForeignKey("users.id"), 
+        ForeignKey("users.id", ondelete="CASCADE"), 
         nullable=False
     )
     course_id: Mapped[int] = mapped_column(
-        ForeignKey("courses.id"), 
-        nullable=False
+        ForeignKey("courses.id", ondelete="CASCADE"), 
+        nullable=False,
+        index=True,
     )
     enrolled_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), 
@@ -94,4 +128,16 @@ class Enrollment(Base):
     course: Mapped[Course] = relationship("Course", back_populates="enrollments")
     
     def __repr__(self):
-        return f"<Enrollment(id={self.id}, user_id={self.user_id}, course_id={self.course_id})>"
\ No newline at end of file
+        return f"<Enrollment(id={self.id}, user_id={self.user_id}, course_id={self.course_id})>"
+
+
+class RevokedToken(Base):
+    """JWT ids revoked before their expiry; rows are useless once expires_at passes."""
+    __tablename__ = "revoked_tokens"
+
+    jti: Mapped[str] = mapped_column(String(32), primary_key=True)
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        index=True,
+    )
@@ -1,11 +1,26 @@
-from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import func, select
+from typing import Annotated, Literal
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
-from database import get_db
-from models import Course
+from config import settings
+from core.bulk import batches, build_report, read_bulk_rows, validate_rows
+from core.catalog import invalidate_catalog
+from core.db_errors import COURSE_UNIQUE_FIELDS, unique_violation
+from core.enrollment_counts import reconcile_enrollment_counts
+from core.http_cache import (
+    COURSE_VERSION,
+    ENROLLMENT_VERSION,
+    PRIVATE_REVALIDATE,
+    conditional,
+    make_etag,
+    precheck,
+    versions,
+)
+from core.pagination import decode_cursor, keyset_page, next_cursor
+from database import get_db, get_read_db
+from models import Course, Enrollment
 
 from schemas import *
 
@@ -16,20 +31,54 @@ router = APIRouter(
 )
 
 DB = Annotated[AsyncSession, Depends(get_db)]
+ReadDB = Annotated[AsyncSession, Depends(get_read_db)]
 
 
 # ── GET /api/admin/courses ──
-@router.get("/courses", response_model=list[CourseResponse])
+@router.get("/courses", response_model=list[CourseResponse] | CursorPage[CourseResponse])
 async def list_courses(
-    db: DB,
+    request: Request,
+    response: Response,
+    db: ReadDB,
     skip: int = Query(default=0, ge=0),
     limit: int = Query(default=100, ge=1, le=500),
+    paginate: Literal["offset", "cursor"] = Query(default="offset"),
+    after: str | None = Query(default=None, description="next_cursor of the previous page"),
 ):
-    """List all courses with pagination."""
-    stmt = select(Course).offset(skip).limit(limit)
+    """
+    List all courses with pagination.
+
+    `paginate=cursor` (or passing `after`) switches to keyset pagination:
+    the response is a page with `items` and `next_cursor`, and `skip` is ignored.
+
+    Pages carry an ETag; revalidating with If-None-Match costs one
+    column-only query and returns 304 when no course on the page changed.
+    """
+    stmt = select(Course).order_by(Course.id)
+    cursor_mode = paginate == "cursor" or after is not None
+
+    if cursor_mode:
+        if after is not None:
+            stmt = stmt.where(Course.id > decode_cursor(after))
+        stmt = stmt.limit(limit + 1)
+    else:
+        stmt = stmt.offset(skip).limit(limit)
+
+    variant = ("courses", cursor_mode)
+    if not_modified := await precheck(request, db, stmt, COURSE_VERSION, *variant):
+        return not_modified
 
     result = await db.execute(stmt)
-    courses = result.scalars().all()
+    courses = list(result.scalars().all())
+    etag = make_etag(*variant, versions(courses, COURSE_VERSION))
+    if not_modified := conditional(request, response, etag, PRIVATE_REVALIDATE):
+        return not_modified
+
+    if cursor_mode:
+        return CursorPage[CourseResponse](
+            next_cursor=next_cursor(courses, limit),
+            items=courses,
+        )
     return courses
 
 
@@ -39,46 +88,116 @@ async def create_course(
     course: CourseCreate,
     db: DB,
 ):
-    """Create a new course."""
-    # Check for duplicate title (case-insensitive)
-    result = await db.execute(
-        select(Course).where(
-            func.lower(Course.title) == course.title.lower()
+    """
+    Create a new course in a single INSERT ... RETURNING.
+    The case-insensitive unique title index rejects duplicates.
+    """
+    stmt = insert(Course).values(**course.model_dump()).returning(Course)
+
+    try:
+        new_course = (await db.execute(stmt)).scalar_one()
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        if unique_violation(exc, COURSE_UNIQUE_FIELDS) == "title":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Course with title '{course.title}' already exists",
+            )
+        raise
+
+    invalidate_catalog()
+    return new_course
+
+
+# ── POST /api/admin/courses:bulk ──
+@router.post("/courses:bulk", response_model=BulkReport)
+async def bulk_create_courses(request: Request, db: DB):
+    """
+    Create many courses from a JSON array or NDJSON body of CourseCreate rows.
+
+    Rows that fail validation or whose title clashes (case-insensitive) with
+    an existing or earlier row are reported and skipped; the rest are
+    inserted in batches in one transaction.
+    """
+    rows = await read_bulk_rows(request)
+    valid, results = validate_rows(rows, CourseCreate)
+
+    # Resolve clashes with existing courses in one set-based query
+    taken_titles = set()
+    if valid:
+        existing = await db.execute(
+            select(func.lower(Course.title)).where(
+                func.lower(Course.title).in_({c.title.lower() for c in valid.values()})
+            )
         )
-    )
-    existing = result.scalars().first()
+        taken_titles.update(existing.scalars())
+
+    new_rows = []
+    for index, course in valid.items():
+        title = course.title.lower()
+        if title in taken_titles:
+            results[index] = BulkRowResult(
+                index=index, status="duplicate", detail=f"Course with title '{course.title}' already exists"
+            )
+        else:
+            taken_titles.add(title)
+            new_rows.append((index, course.model_dump()))
 
-    if existing:
+    try:
+        # Plain executemany: RETURNING would make SQLite insert row by row
+        for batch in batches(new_rows, settings.BULK_INSERT_BATCH_SIZE):
+            await db.execute(insert(Course), [row for _, row in batch])
+        if new_rows:
+            # Map the new ids back to their rows in the same transaction
+            created = await db.execute(
+                select(func.lower(Course.title), Course.id).where(
+                    func.lower(Course.title).in_([row["title"].lower() for _, row in new_rows])
+                )
+            )
+            course_ids = dict(created.all())
+            for index, row in new_rows:
+                results[index] = BulkRowResult(
+                    index=index, status="created", id=course_ids[row["title"].lower()]
+                )
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Course with title '{course.title}' already exists",
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A concurrent write created a conflicting course; retry the request",
         )
 
-    new_course = Course(
-        title=course.title,
-        description=course.description,
-    )
+    if new_rows:
+        invalidate_catalog()
+    return build_report(results)
+
 
-    db.add(new_course)
+# ── POST /api/admin/courses:reconcile-counts ──
+@router.post("/courses:reconcile-counts")
+async def reconcile_course_counts(db: DB):
+    """Recompute every course's enrollment_count from the enrollments table."""
+    repaired = await reconcile_enrollment_counts(db)
     await db.commit()
-    await db.refresh(new_course)
-    return new_course
+    return {"repaired": repaired}
 
 
 # ── GET /api/admin/courses/{course_id} ──
-@router.get("/courses/{course_id}", response_model=CourseResponse | CourseWithUsers)
+@router.get("/courses/{course_id}", response_model=CourseWithUsers | CourseResponse)
 async def get_course(
+    request: Request,
+    response: Response,
     course_id: int,
-    db: DB,
+    db: ReadDB,
     load_enrollments: bool = Query(default=False),
+    enrollments_limit: int = Query(default=50, ge=1, le=500),
+    enrollments_after: str | None = Query(default=None, description="enrollments_next_cursor of the previous response"),
 ):
-    """Get a single course by ID. Optionally load enrollments."""
-    stmt = select(Course).where(Course.id == course_id)
-
-    if load_enrollments:
-        stmt = stmt.options(selectinload(Course.enrollments))
-
-    result = await db.execute(stmt)
+    """
+    Get a single course by ID. `enrollment_count` is always included;
+    `load_enrollments` adds one keyset page of its enrollments.
+    """
+    result = await db.execute(select(Course).where(Course.id == course_id))
     course = result.scalars().first()
 
     if not course:
@@ -86,7 +205,31 @@ async def get_course(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Course with ID {course_id} not found",
         )
-    return course
+
+    version = versions([course], COURSE_VERSION)
+
+    if not load_enrollments:
+        etag = make_etag("course", version)
+        if not_modified := conditional(request, response, etag, PRIVATE_REVALIDATE, course.updated_at):
+            return not_modified
+        return CourseResponse.model_validate(course)
+
+    enrollments, cursor = await keyset_page(
+        db,
+        select(Enrollment).where(Enrollment.course_id == course_id),
+        Enrollment.id,
+        enrollments_limit,
+        enrollments_after,
+    )
+    # Enrollments don't touch the course's updated_at: no Last-Modified
+    etag = make_etag("course+enrollments", version, versions(enrollments, ENROLLMENT_VERSION), cursor)
+    if not_modified := conditional(request, response, etag, PRIVATE_REVALIDATE):
+        return not_modified
+    return CourseWithUsers.model_validate({
+        **CourseResponse.model_validate(course).model_dump(),
+        "enrollments": enrollments,
+        "enrollments_next_cursor": cursor,
+    })
 
 
 # ── PATCH /api/admin/courses/{course_id} ──
@@ -94,15 +237,6 @@ async def get_course(
 async def update_course(course_id: int, course_in: CourseUpdate, db: DB):
     """Partially update a course. Only provided fields are changed."""
 
-    result = await db.execute(select(Course).where(Course.id == course_id))
-    course = result.scalars().first()
-
-    if not course:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Course with ID {course_id} not found",
-        )
-
     update_data = course_in.model_dump(exclude_unset=True)
 
     if not update_data:
@@ -111,25 +245,31 @@ async def update_course(course_id: int, course_in: CourseUpdate, db: DB):
             detail="No fields provided for update",
         )
 
-    # Check title uniqueness if being updated
-    if "title" in update_data:
-        result = await db.execute(
-            select(Course).where(
-                func.lower(Course.title) == update_data["title"].lower(),
-                Course.id != course_id,
-            )
-        )
-        if result.scalars().first():
+    stmt = (
+        update(Course)
+        .where(Course.id == course_id)
+        .values(**update_data)
+        .returning(Course)
+    )
+
+    try:
+        course = (await db.execute(stmt)).scalar_one_or_none()
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        if unique_violation(exc, COURSE_UNIQUE_FIELDS) == "title":
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail=f"Course with title '{update_data['title']}' already exists",
             )
+        raise
 
-    for field, value in update_data.items():
-        setattr(course, field, value)
-
-    await db.commit()
-    await db.refresh(course)
+    if not course:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Course with ID {course_id} not found",
+        )
+    invalidate_catalog()
     return course
 
 
@@ -148,6 +288,9 @@ async def delete_course(course_id: int, db: DB):
             detail=f"Course with ID {course_id} not found",
         )
 
+    # Indexed bulk delete; older databases lack ON DELETE CASCADE
+    await db.execute(delete(Enrollment).where(Enrollment.course_id == course_id))
     await db.delete(course)
     await db.commit()
+    invalidate_catalog()
     return None
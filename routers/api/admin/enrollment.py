@@ -0,0 +1,195 @@
+from datetime import UTC, datetime
+from typing import Annotated
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import delete, literal, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.enrollment_counts import adjust_enrollment_count
+from core.pagination import keyset_page
+from database import dialect_insert, get_db, get_read_db
+from models import Course, Enrollment, User
+
+from schemas import *
+
+
+router = APIRouter(
+    prefix="/api/admin",
+    tags=["admin - enrollments"]
+)
+
+DB = Annotated[AsyncSession, Depends(get_db)]
+ReadDB = Annotated[AsyncSession, Depends(get_read_db)]
+
+
+# ── POST /api/admin/enrollments ──
+@router.post("/enrollments", response_model=EnrollmentBrief, status_code=status.HTTP_201_CREATED)
+async def enroll(enrollment: EnrollmentCreate, response: Response, db: DB):
+    """
+    Enroll a user in a course. Idempotent: enrolling twice returns the
+    existing enrollment with 200 instead of 201.
+    """
+    stmt = (
+        dialect_insert(db.bind.dialect.name, Enrollment)
+        .values(
+            user_id=enrollment.user_id,
+            course_id=enrollment.course_id,
+            enrolled_at=datetime.now(UTC),
+        )
+        .on_conflict_do_nothing(index_elements=["user_id", "course_id"])
+        .returning(Enrollment)
+    )
+
+    try:
+        created = (await db.execute(stmt)).scalar_one_or_none()
+        if created is not None:
+            await adjust_enrollment_count(db, enrollment.course_id, 1)
+        await db.commit()
+    except IntegrityError:
+        # Foreign key violation: unknown user or course
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"User {enrollment.user_id} or course {enrollment.course_id} not found",
+        )
+
+    if created is not None:
+        return created
+
+    result = await db.execute(
+        select(Enrollment).where(
+            Enrollment.user_id == enrollment.user_id,
+            Enrollment.course_id == enrollment.course_id,
+        )
+    )
+    response.status_code = status.HTTP_200_OK
+    return result.scalar_one()
+
+
+# ── DELETE /api/admin/courses/{course_id}/enrollments/{user_id} ──
+@router.delete("/courses/{course_id}/enrollments/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def unenroll(course_id: int, user_id: int, db: DB):
+    """Remove a user from a course."""
+    result = await db.execute(
+        delete(Enrollment)
+        .where(Enrollment.course_id == course_id, Enrollment.user_id == user_id)
+        .returning(Enrollment.id)
+    )
+    removed = result.scalar_one_or_none()
+    if removed is not None:
+        await adjust_enrollment_count(db, course_id, -1)
+    await db.commit()
+
+    if removed is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"User {user_id} is not enrolled in course {course_id}",
+        )
+    return None
+
+
+# ── POST /api/admin/courses/{course_id}/enrollments:bulk ──
+@router.post("/courses/{course_id}/enrollments:bulk", response_model=BulkEnrollmentResult)
+async def bulk_enroll(course_id: int, body: BulkEnrollment, db: DB):
+    """
+    Enroll many users in a course with one INSERT ... SELECT.
+    Unknown user ids and existing enrollments are skipped; `changed`
+    lists the users that were newly enrolled.
+    """
+    user_ids = set(body.user_ids)
+    stmt = (
+        dialect_insert(db.bind.dialect.name, Enrollment)
+        .from_select(
+            ["user_id", "course_id", "enrolled_at"],
+            select(User.id, literal(course_id), literal(datetime.now(UTC)))
+            .where(User.id.in_(user_ids)),
+        )
+        .on_conflict_do_nothing(index_elements=["user_id", "course_id"])
+        .returning(Enrollment.user_id)
+    )
+
+    try:
+        enrolled = sorted((await db.execute(stmt)).scalars())
+        await adjust_enrollment_count(db, course_id, len(enrolled))
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Course with ID {course_id} not found",
+        )
+
+    return BulkEnrollmentResult(course_id=course_id, requested=len(user_ids), changed=enrolled)
+
+
+# ── POST /api/admin/courses/{course_id}/enrollments:bulk-delete ──
+@router.post("/courses/{course_id}/enrollments:bulk-delete", response_model=BulkEnrollmentResult)
+async def bulk_unenroll(course_id: int, body: BulkEnrollment, db: DB):
+    """Remove many users from a course with one DELETE."""
+    user_ids = set(body.user_ids)
+    result = await db.execute(
+        delete(Enrollment)
+        .where(Enrollment.course_id == course_id, Enrollment.user_id.in_(user_ids))
+        .returning(Enrollment.user_id)
+    )
+    removed = sorted(result.scalars())
+    await adjust_enrollment_count(db, course_id, -len(removed))
+    await db.commit()
+
+    return BulkEnrollmentResult(course_id=course_id, requested=len(user_ids), changed=removed)
+
+
+# ── GET /api/admin/courses/{course_id}/enrollments ──
+@router.get("/courses/{course_id}/enrollments", response_model=CursorPage[EnrollmentBrief])
+async def list_course_enrollments(
+    course_id: int,
+    db: ReadDB,
+    limit: int = Query(default=100, ge=1, le=500),
+    after: str | None = Query(default=None, description="next_cursor of the previous page"),
+):
+    """List a course's enrollments, keyset-paginated by enrollment id."""
+    enrollments, cursor = await keyset_page(
+        db,
+        select(Enrollment).where(Enrollment.course_id == course_id),
+        Enrollment.id,
+        limit,
+        after,
+    )
+    return CursorPage[EnrollmentBrief](next_cursor=cursor, items=enrollments)
+
+
+# ── GET /api/admin/users/{user_id}/enrollments ──
+@router.get("/users/{user_id}/enrollments", response_model=CursorPage[EnrollmentBrief])
+async def list_user_enrollments(
+    user_id: int,
+    db: ReadDB,
+    limit: int = Query(default=100, ge=1, le=500),
+    after: str | None = Query(default=None, description="next_cursor of the previous page"),
+):
+    """List a user's enrollments, keyset-paginated by enrollment id."""
+    enrollments, cursor = await keyset_page(
+        db,
+        select(Enrollment).where(Enrollment.user_id == user_id),
+        Enrollment.id,
+        limit,
+        after,
+    )
+    return CursorPage[EnrollmentBrief](next_cursor=cursor, items=enrollments)
+
+
+# ── GET /api/admin/users/{user_id}/dashboard ──
+@router.get("/users/{user_id}/dashboard", response_model=list[DashboardCourse])
+async def user_dashboard(user_id: int, db: ReadDB):
+    """A user's enrolled courses, newest first, from a single joined SELECT."""
+    result = await db.execute(
+        select(
+            Course.id.label("course_id"),
+            Course.title,
+            Course.description,
+            Enrollment.enrolled_at,
+        )
+        .join(Enrollment, Enrollment.course_id == Course.id)
+        .where(Enrollment.user_id == user_id)
+        .order_by(Enrollment.enrolled_at.desc())
+    )
+    return result.all()
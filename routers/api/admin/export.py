@@ -0,0 +1,25 @@
+from typing import Literal
+from fastapi import APIRouter, Query
+
+from core.export import EXPORTS, ExportFormat, export_response
+
+
+router = APIRouter(
+    prefix="/api/admin",
+    tags=["admin - export"]
+)
+
+
+# ── GET /api/admin/export/{resource} ──
+@router.get("/export/{resource}")
+async def export_table(
+    resource: Literal["users", "courses", "enrollments"],
+    format: ExportFormat = Query(default="ndjson"),
+    batch_size: int | None = Query(default=None, ge=100, le=10_000),
+):
+    """
+    Stream a whole table as NDJSON, CSV or a JSON array.
+    Rows are read in keyset batches, so memory use is constant.
+    """
+    model, columns = EXPORTS[resource]
+    return export_response(model, columns, format, resource, batch_size)
@@ -1,12 +1,28 @@
-from typing import Annotated, Sequence
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import func, select
+from typing import Annotated, Literal, Sequence
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
-from core.security import hash_password
-from database import get_db
-from models import User
+from config import settings
+from core.bulk import batches, build_report, read_bulk_rows, validate_rows
+from core.cache import user_cache
+from core.db_errors import USER_UNIQUE_FIELDS, unique_violation
+from core.enrollment_counts import decrement_for_user
+from core.http_cache import (
+    ENROLLMENT_VERSION,
+    PRIVATE_REVALIDATE,
+    USER_VERSION,
+    conditional,
+    make_etag,
+    precheck,
+    versions,
+)
+from core.pagination import decode_cursor, keyset_page, next_cursor
+from core.search import trigram_terms, user_search_filter
+from core.security import hash_password_async, hash_passwords_async
+from database import get_db, get_read_db
+from models import Enrollment, User
 
 from schemas import *
 
@@ -17,24 +33,61 @@ router = APIRouter(
 )
 
 DB = Annotated[AsyncSession, Depends(get_db)]
+ReadDB = Annotated[AsyncSession, Depends(get_read_db)]
 
 
 # ── GET /api/admin/users ──
-@router.get("/users", response_model=list[UserAdmin])
+@router.get("/users", response_model=list[UserAdmin] | CursorPage[UserAdmin])
 async def list_users(
-    db: DB,
+    request: Request,
+    response: Response,
+    db: ReadDB,
     skip: int = Query(default=0, ge=0),
     limit: int = Query(default=100, ge=1, le=500),
-    load_enrollments: bool = Query(default=False),
+    load_enrollments: bool = Query(default=False, deprecated=True, description="Ignored; use GET /users/{user_id}"),
+    paginate: Literal["offset", "cursor"] = Query(default="offset"),
+    after: str | None = Query(default=None, description="next_cursor of the previous page"),
+    ids: list[int] | None = Query(default=None, max_length=500, description="Fetch exactly these users; repeat the parameter"),
 ):
-    """List all users with pagination."""
-    stmt = select(User).offset(skip).limit(limit)
-
-    if load_enrollments:
-        stmt = stmt.options(selectinload(User.enrollments))
+    """
+    List all users with pagination.
+
+    `paginate=cursor` (or passing `after`) switches to keyset pagination:
+    the response is a page with `items` and `next_cursor`, and `skip` is ignored.
+
+    `ids` fetches the given users in one primary-key lookup instead; unknown
+    ids are omitted and pagination parameters are ignored.
+
+    Responses carry an ETag; revalidating with If-None-Match costs one
+    column-only query and returns 304 when none of the users changed.
+    """
+    stmt = select(User).order_by(User.id)
+    cursor_mode = not ids and (paginate == "cursor" or after is not None)
+
+    if ids:
+        stmt = stmt.where(User.id.in_(set(ids)))
+    elif cursor_mode:
+        if after is not None:
+            stmt = stmt.where(User.id > decode_cursor(after))
+        stmt = stmt.limit(limit + 1)
+    else:
+        stmt = stmt.offset(skip).limit(limit)
+
+    variant = ("users", cursor_mode)
+    if not_modified := await precheck(request, db, stmt, USER_VERSION, *variant):
+        return not_modified
 
     result = await db.execute(stmt)
-    users = result.scalars().all()
+    users = list(result.scalars().all())
+    etag = make_etag(*variant, versions(users, USER_VERSION))
+    if not_modified := conditional(request, response, etag, PRIVATE_REVALIDATE):
+        return not_modified
+
+    if cursor_mode:
+        return CursorPage[UserAdmin](
+            next_cursor=next_cursor(users, limit),
+            items=users,
+        )
     return users
 
 
@@ -44,123 +97,255 @@ async def create_user(
     user: UserCreate,
     db: DB
 ):
-    """Create a new user."""
-    stmt = await db.execute(
-        select(User).where(
-            (func.lower(User.username) == user.username.lower()) |
-            (func.lower(User.email) == user.email.lower())
+    """
+    Create a new user in a single INSERT ... RETURNING.
+    The case-insensitive unique indexes reject duplicates.
+    """
+    stmt = (
+        insert(User)
+        .values(
+            username=user.username,
+            email=user.email.lower(),
+            first_name=user.first_name,
+            last_name=user.last_name,
+            hashed_password=await hash_password_async(user.password),
         )
+        .returning(User)
     )
-    existing_user = stmt.scalars().first()
 
-    if existing_user:
-        if existing_user.username.lower() == user.username.lower():
+    try:
+        new_user = (await db.execute(stmt)).scalar_one()
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        field = unique_violation(exc, USER_UNIQUE_FIELDS)
+        if field == "username":
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Username '{user.username}' already exists"
             )
-        else:
+        if field == "email":
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Email '{user.email}' already exists"
             )
-    
-    new_user = User(
-        username=user.username,
-        email=user.email.lower(),
-        first_name=user.first_name,
-        last_name=user.last_name,
-        hashed_password=hash_password(user.password),
-    )
-    
-    db.add(new_user)
-    await db.commit()
-    await db.refresh(new_user)
+        raise
+
     return new_user
 
 
-# ── GET /api/admin/users/{user_id} ──
-@router.get("/users/{user_id}", response_model=UserAdmin)
-async def get_user(
-    user_id: int,
-    db: DB,
-    load_enrollments: bool = Query(default=False)
+# ── POST /api/admin/users:bulk ──
+@router.post("/users:bulk", response_model=BulkReport)
+async def bulk_create_users(request: Request, db: DB, read_db: ReadDB):
+    """
+    Create many users from a JSON array or NDJSON body of UserCreate rows,
+    at most BULK_MAX_USER_ROWS per request.
+
+    Rows that fail validation or clash with an existing (or earlier) username
+    or email are reported and skipped; the rest are inserted in batches in
+    one transaction.
+    """
+    rows = await read_bulk_rows(request, settings.BULK_MAX_USER_ROWS)
+    valid, results = validate_rows(rows, UserCreate)
+
+    # Resolve clashes with existing users in one set-based query. It runs
+    # on the reader: the single writer connection must not be held while
+    # the passwords are hashed; a clash that appears meanwhile is a 409
+    taken_usernames, taken_emails = set(), set()
+    if valid:
+        existing = await read_db.execute(
+            select(func.lower(User.username), func.lower(User.email)).where(
+                func.lower(User.username).in_({u.username.lower() for u in valid.values()}) |
+                func.lower(User.email).in_({u.email.lower() for u in valid.values()})
+            )
+        )
+        for username, email in existing:
+            taken_usernames.add(username)
+            taken_emails.add(email)
+    await read_db.close()
+
+    pending = []
+    for index, user in valid.items():
+        username, email = user.username.lower(), user.email.lower()
+        if username in taken_usernames:
+            results[index] = BulkRowResult(
+                index=index, status="duplicate", detail=f"Username '{user.username}' already exists"
+            )
+        elif email in taken_emails:
+            results[index] = BulkRowResult(
+                index=index, status="duplicate", detail=f"Email '{user.email}' already exists"
+            )
+        else:
+            taken_usernames.add(username)
+            taken_emails.add(email)
+            pending.append((index, user))
+
+    hashed_passwords = await hash_passwords_async([user.password for _, user in pending])
+    new_rows = [
+        (index, {
+            "username": user.username,
+            "email": user.email.lower(),
+            "first_name": user.first_name,
+            "last_name": user.last_name,
+            "hashed_password": hashed_password,
+        })
+        for (index, user), hashed_password in zip(pending, hashed_passwords)
+    ]
+
+    try:
+        # Plain executemany: RETURNING would make SQLite insert row by row
+        for batch in batches(new_rows, settings.BULK_INSERT_BATCH_SIZE):
+            await db.execute(insert(User), [row for _, row in batch])
+        if new_rows:
+            # Map the new ids back to their rows in the same transaction
+            created = await db.execute(
+                select(func.lower(User.username), User.id).where(
+                    func.lower(User.username).in_([row["username"].lower() for _, row in new_rows])
+                )
+            )
+            user_ids = dict(created.all())
+            for index, row in new_rows:
+                results[index] = BulkRowResult(
+                    index=index, status="created", id=user_ids[row["username"].lower()]
+                )
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A concurrent write created a conflicting user; retry the request",
+        )
+
+    return build_report(results)
+
+
+# ── GET /api/admin/users/search ──
+@router.get("/users/search", response_model=CursorPage[UserAdmin])
+async def search_users(
+    db: ReadDB,
+    q: str = Query(min_length=3, max_length=200, description="Substrings of username, email or name; terms under 3 characters are ignored"),
+    limit: int = Query(default=25, ge=1, le=100),
+    after: str | None = Query(default=None, description="next_cursor of the previous page"),
 ):
-    
-    stmt = select(User).where(User.id == user_id)
-    if load_enrollments:
-        stmt = stmt.options(selectinload(User.enrollments))
+    """
+    Users whose username, email, first or last name contain every term
+    in `q`, served from the trigram index and paged by id.
+    """
+    terms = trigram_terms(q)
+    if not terms:
+        return CursorPage[UserAdmin](items=[], next_cursor=None)
+
+    users, cursor = await keyset_page(
+        db,
+        select(User).where(user_search_filter(db.bind.dialect.name, terms)),
+        User.id,
+        limit,
+        after,
+    )
+    return CursorPage[UserAdmin](next_cursor=cursor, items=users)
 
-    result = await db.execute(stmt)
+
+# ── GET /api/admin/users/by-username/{username} ──
+@router.get("/users/by-username/{username}", response_model=UserAdmin)
+async def get_user_by_username(username: str, db: ReadDB):
+    """Case-insensitive lookup served by ix_users_username_lower."""
+    result = await db.execute(
+        select(User).where(func.lower(User.username) == username.lower())
+    )
     user = result.scalars().first()
 
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"User with ID {user_id} not found"
+            detail=f"User with username {username} not found"
         )
     return user
 
 
-# ── GET /api/admin/users/{username} ──
-@router.get("/users/{username}", response_model=UserAdmin)
-async def get_user(
-    username: str,
-    db: DB,
-    load_enrollments: bool = Query(default=False)
-):
-    
-    stmt = select(User).where(User.username == username)
-    if load_enrollments:
-        stmt = stmt.options(selectinload(User.enrollments))
-
-    result = await db.execute(stmt)
+# ── GET /api/admin/users/by-email/{email} ──
+@router.get("/users/by-email/{email}", response_model=UserAdmin)
+async def get_user_by_email(email: str, db: ReadDB):
+    """Case-insensitive lookup served by ix_users_email_lower."""
+    result = await db.execute(
+        select(User).where(func.lower(User.email) == email.lower())
+    )
     user = result.scalars().first()
 
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"User with username {username} not found"
+            detail=f"User with email {email} not found"
         )
     return user
 
 
-# ── GET /api/admin/users/{email} ──
-@router.get("/users/{email}", response_model=UserAdmin)
+# ── GET /api/admin/users/{user_id} ──
+@router.get("/users/{user_id}", response_model=UserWithEnrollments | UserAdmin)
 async def get_user(
-    email: str,
-    db: DB,
-    load_enrollments: bool = Query(default=False)
+    request: Request,
+    response: Response,
+    user_id: int,
+    db: ReadDB,
+    load_enrollments: bool = Query(default=False),
+    count_only: bool = Query(default=False, description="With load_enrollments, return just enrollment_count"),
+    enrollments_limit: int = Query(default=50, ge=1, le=500),
+    enrollments_after: str | None = Query(default=None, description="enrollments_next_cursor of the previous response"),
 ):
-    
-    stmt = select(User).where(User.email == email)
-    if load_enrollments:
-        stmt = stmt.options(selectinload(User.enrollments))
-
-    result = await db.execute(stmt)
+    """
+    Get a single user by ID. `load_enrollments` adds `enrollment_count`
+    (an indexed COUNT) and one keyset page of enrollments.
+    """
+    result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalars().first()
 
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"User with email {email} not found"
+            detail=f"User with ID {user_id} not found"
         )
-    return user
+
+    version = versions([user], USER_VERSION)
+
+    if not load_enrollments:
+        etag = make_etag("user", version)
+        if not_modified := conditional(request, response, etag, PRIVATE_REVALIDATE, user.updated_at):
+            return not_modified
+        return UserAdmin.model_validate(user)
+
+    enrollment_count = (await db.execute(
+        select(func.count()).where(Enrollment.user_id == user_id)
+    )).scalar_one()
+
+    enrollments, cursor = [], None
+    if not count_only:
+        enrollments, cursor = await keyset_page(
+            db,
+            select(Enrollment).where(Enrollment.user_id == user_id),
+            Enrollment.id,
+            enrollments_limit,
+            enrollments_after,
+        )
+
+    # Enrollments don't touch the user's updated_at: no Last-Modified
+    etag = make_etag(
+        "user+enrollments", version, enrollment_count,
+        versions(enrollments, ENROLLMENT_VERSION), cursor,
+    )
+    if not_modified := conditional(request, response, etag, PRIVATE_REVALIDATE):
+        return not_modified
+
+    return UserWithEnrollments.model_validate({
+        **UserAdmin.model_validate(user).model_dump(),
+        "enrollment_count": enrollment_count,
+        "enrollments": enrollments,
+        "enrollments_next_cursor": cursor,
+    })
 
 
 # ── PATCH /api/admin/users/{user_id} ──
 @router.patch("/users/{user_id}", response_model=UserAdmin)
 async def update_user(user_id: int, user_in: UserUpdate, db: DB):
     """Partially update a user. Only provided fields are changed."""
-    
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalars().first()
-
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"User with id '{user_id}' not found",
-        )
 
     # Only get fields that were actually provided
     update_data = user_in.model_dump(exclude_unset=True)
@@ -171,40 +356,41 @@ async def update_user(user_id: int, user_in: UserUpdate, db: DB):
             detail="No fields provided for update"
         )
 
-    if "username" in update_data:
-        result = await db.execute(
-            select(User).where(
-                func.lower(User.username) == update_data["username"].lower(),
-                User.id != user_id,
-            )
-        )
-        if result.scalars().first():
+    if "email" in update_data:
+        update_data["email"] = update_data["email"].lower()
+
+    stmt = (
+        update(User)
+        .where(User.id == user_id)
+        .values(**update_data)
+        .returning(User)
+    )
+
+    try:
+        user = (await db.execute(stmt)).scalar_one_or_none()
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        field = unique_violation(exc, USER_UNIQUE_FIELDS)
+        if field == "username":
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail=f"Username '{update_data['username']}' is already taken",
             )
-
-
-    if "email" in update_data:
-        update_data["email"] = update_data["email"].lower()
-        
-        result = await db.execute(
-            select(User).where(
-                func.lower(User.email) == update_data["email"],
-                User.id != user_id,
-            )
-        )
-        if result.scalars().first():
+        if field == "email":
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail=f"Email '{update_data['email']}' is already registered",
             )
+        raise
 
-    for field, value in update_data.items():
-        setattr(user, field, value)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"User with id '{user_id}' not found",
+        )
 
-    await db.commit()
-    await db.refresh(user)
+    user_cache.pop(user_id)
     return user
 
 
@@ -224,6 +410,10 @@ async def delete_user(user_id: int, db: DB):
             detail=f"User with ID {user_id} not found"
         )
     
+    # Indexed bulk delete; older databases lack ON DELETE CASCADE
+    await decrement_for_user(db, user_id)
+    await db.execute(delete(Enrollment).where(Enrollment.user_id == user_id))
     await db.delete(user)
     await db.commit()
+    user_cache.pop(user_id)
     return None
\ No newline at end of file
@@ -0,0 +1,79 @@
+from typing import Annotated
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from core.cache import TTLCache
+from core.http_cache import COURSE_VERSION, PUBLIC_CATALOG, conditional, make_etag, versions
+from core.search import course_search_stmt, search_terms
+from database import get_read_db
+from models import Course
+
+from schemas import *
+
+
+router = APIRouter(
+    prefix="/api/courses",
+    tags=["courses"]
+)
+
+ReadDB = Annotated[AsyncSession, Depends(get_read_db)]
+
+# limit -> ranked courses; counters move constantly, so a short TTL is the
+# only invalidation
+top_courses_cache = TTLCache("top_courses", maxsize=16, ttl=settings.TOP_COURSES_CACHE_TTL_SECONDS)
+
+
+# ── GET /api/courses/top ──
+@router.get("/top", response_model=list[CourseResponse])
+async def top_courses(
+    request: Request,
+    response: Response,
+    db: ReadDB,
+    limit: int = Query(default=10, ge=1, le=100),
+):
+    """Most-enrolled courses, read from the precomputed counters."""
+    courses = top_courses_cache.get(limit)
+    if courses is None:
+        result = await db.execute(
+            select(Course)
+            .order_by(Course.enrollment_count.desc(), Course.id)
+            .limit(limit)
+        )
+        courses = [CourseResponse.model_validate(course) for course in result.scalars()]
+        top_courses_cache.set(limit, courses)
+
+    etag = make_etag("top", limit, versions(courses, COURSE_VERSION))
+    cache_control = f"public, max-age={int(settings.TOP_COURSES_CACHE_TTL_SECONDS)}"
+    if not_modified := conditional(request, response, etag, cache_control):
+        return not_modified
+    return courses
+
+
+# ── GET /api/courses/search ──
+@router.get("/search", response_model=list[CourseResponse])
+async def search_courses(
+    request: Request,
+    response: Response,
+    db: ReadDB,
+    q: str = Query(min_length=1, max_length=200, description="Keywords; each matches as a word prefix"),
+    skip: int = Query(default=0, ge=0, le=1000),
+    limit: int = Query(default=20, ge=1, le=100),
+):
+    """
+    Courses matching every keyword in `q`, best match first. Titles
+    weigh more than descriptions. Page through with skip/limit.
+    """
+    terms = search_terms(q)
+    if not terms:
+        return []
+
+    stmt = course_search_stmt(db.bind.dialect.name, terms).offset(skip).limit(limit)
+    result = await db.execute(stmt)
+    courses = result.scalars().all()
+
+    etag = make_etag("search", terms, skip, versions(courses, COURSE_VERSION))
+    if not_modified := conditional(request, response, etag, PUBLIC_CATALOG):
+        return not_modified
+    return courses
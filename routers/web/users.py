@@ -1,24 +1,43 @@
 from typing import Annotated
-from fastapi import APIRouter, Depends, Form, HTTPException, Request, status
+from fastapi import APIRouter, Depends, Form, HTTPException, Request, Response, status
 from fastapi.responses import JSONResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy import func, select
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.security import hash_password, verify_password
+from config import settings
+from core.catalog import get_catalog
+from core.db_errors import USER_UNIQUE_FIELDS, unique_violation
+from core.security import (
+    ACCESS_COOKIE,
+    REFRESH_COOKIE,
+    create_session_tokens,
+    hash_password_async,
+    revoke_token,
+    set_token_cookies,
+    verify_password_async,
+)
 from database import get_db
+from middleware import CurrentUser, rotate_session
 from models import User
+from templating import templates
 
 router = APIRouter(
     include_in_schema=False,
     tags=["Web Auth"]
 )
 
-templates = Jinja2Templates(directory="templates")
-
 DB = Annotated[AsyncSession, Depends(get_db)]
 
 
+def set_session_cookies(response: Response, user: User) -> None:
+    """Start a session for `user` according to SESSION_MODE."""
+    if settings.SESSION_MODE == "jwt":
+        set_token_cookies(response, *create_session_tokens(user))
+    else:
+        response.set_cookie(key="user_id", value=str(user.id), httponly=True)
+
+
 @router.get("/login", name="login")
 async def login_page(request: Request):
     """Display login page"""
@@ -35,7 +54,7 @@ async def signup_page(request: Request):
     return templates.TemplateResponse(
         request,
         "signup.html",
-        {"title": "Sign Up"},
+        {"title": "Sign Up", "catalog": await get_catalog()},
     )
 
 
@@ -49,39 +68,37 @@ async def signup_user(
     last_name: str | None = Form(None),
 ):
     """Handle signup form submission."""
-    # Check username uniqueness (case-insensitive)
-    result = await db.execute(
-        select(User)
-        .where(func.lower(User.username) == username.lower())
-    )
-    if result.scalars().first():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Username '{username}' already exists"
-        )
-
-    # Check email uniqueness (case-insensitive)
-    result = await db.execute(
-        select(User)
-        .where(func.lower(User.email) == email.lower())
-    )
-    if result.scalars().first():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Email '{email}' already exists"
+    # One INSERT ... RETURNING; the case-insensitive unique indexes
+    # reject taken usernames/emails, even under concurrent signups
+    stmt = (
+        insert(User)
+        .values(
+            username=username,
+            email=email.lower(),
+            hashed_password=await hash_password_async(password),
+            first_name=first_name or None,
+            last_name=last_name or None,
         )
-
-    new_user = User(
-        username=username,
-        email=email.lower(),
-        hashed_password=hash_password(password),
-        first_name=first_name or None,
-        last_name=last_name or None,
+        .returning(User)
     )
 
-    db.add(new_user)
-    await db.commit()
-    await db.refresh(new_user)
+    try:
+        new_user = (await db.execute(stmt)).scalar_one()
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        field = unique_violation(exc, USER_UNIQUE_FIELDS)
+        if field == "username":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Username '{username}' already exists"
+            )
+        if field == "email":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Email '{email}' already exists"
+            )
+        raise
 
     response = JSONResponse(
         content={
@@ -91,7 +108,7 @@ async def signup_user(
         },
         status_code=status.HTTP_201_CREATED,
     )
-    response.set_cookie(key="user_id", value=str(new_user.id), httponly=True)
+    set_session_cookies(response, new_user)
     return response
 
 
@@ -108,7 +125,7 @@ async def login_user(
     )
     user = result.scalars().first()
 
-    if not user or not verify_password(password, user.hashed_password):
+    if not user or not await verify_password_async(password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password"
@@ -121,25 +138,60 @@ async def login_user(
             "email": user.email,
         }
     )
-    response.set_cookie(key="user_id", value=str(user.id), httponly=True)
+    set_session_cookies(response, user)
+    return response
+
+
+@router.post("/refresh")
+async def refresh_session(request: Request, db: DB):
+    """
+    Rotate the JWT session: revoke the refresh token and issue a new pair.
+    Pages don't need this (AuthMiddleware refreshes an expired access
+    cookie by itself); it is for clients that manage the session directly.
+    """
+    refresh_token = request.cookies.get(REFRESH_COOKIE)
+    session = await rotate_session(db, refresh_token) if refresh_token else None
+    if session is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token"
+        )
+
+    user, access_token, refresh_token = session
+
+    response = JSONResponse(
+        content={
+            "id": user.id,
+            "username": user.username,
+            "email": user.email,
+        }
+    )
+    set_token_cookies(response, access_token, refresh_token)
     return response
 
 
 @router.get("/signout", name="signout")
-async def signout_user():
-    """Clear session cookie and redirect to home."""
+async def signout_user(request: Request, db: DB):
+    """Clear session cookies (revoking any tokens) and redirect to home."""
+    for cookie in (ACCESS_COOKIE, REFRESH_COOKIE):
+        token = request.cookies.get(cookie)
+        if token:
+            await revoke_token(db, token)
+
     response = RedirectResponse(url="/", status_code=status.HTTP_302_FOUND)
     response.delete_cookie(key="user_id")
+    response.delete_cookie(key=ACCESS_COOKIE)
+    response.delete_cookie(key=REFRESH_COOKIE)
     return response
 
 
 @router.get("/account", name="account")
-async def account_page(request: Request):
+async def account_page(request: Request, user: CurrentUser):
     """Display account page"""
-    if not request.state.user:
+    if not user:
         return RedirectResponse(url="/", status_code=status.HTTP_302_FOUND)
     return templates.TemplateResponse(
         request,
         "account.html",
-        {"title": "Account", "user": request.state.user},
+        {"title": "Account", "user": user, "catalog": await get_catalog()},
     )
\ No newline at end of file
@@ -1,3 +1,5 @@
 from schemas.user import *
 from schemas.course import *
 from schemas.enrollment import *
+from schemas.pagination import *
+from schemas.bulk import *
@@ -0,0 +1,18 @@
+from typing import Literal
+from pydantic import BaseModel
+
+
+class BulkRowResult(BaseModel):
+    """Outcome of one row of a bulk request."""
+    index: int
+    status: Literal["created", "duplicate", "invalid"]
+    id: int | None = None
+    detail: str | list | None = None
+
+
+class BulkReport(BaseModel):
+    """Per-row report for a bulk import."""
+    created: int
+    duplicates: int
+    invalid: int
+    results: list[BulkRowResult]
@@ -4,9 +4,13 @@ from pydantic import BaseModel, ConfigDict, Field
 from schemas.enrollment import EnrollmentBrief
 
 
+LANGUAGE_PATTERN = r"^[a-z0-9-]+$"
+
+
 class CourseBase(BaseModel):
     title: str = Field(min_length=1, max_length=300)
     description: str | None = Field(default=None, max_length=2000)
+    language: str | None = Field(default=None, max_length=50, pattern=LANGUAGE_PATTERN)
 
 
 class CourseCreate(CourseBase):
@@ -18,6 +22,7 @@ class CourseUpdate(BaseModel):
     """Fields allowed to be updated on a course."""
     title: str | None = Field(default=None, min_length=1, max_length=300)
     description: str | None = Field(default=None, max_length=2000)
+    language: str | None = Field(default=None, max_length=50, pattern=LANGUAGE_PATTERN)
 
 
 class CourseResponse(BaseModel):
@@ -27,10 +32,16 @@ class CourseResponse(BaseModel):
     id: int
     title: str
     description: str | None = None
+    language: str | None = None
+    enrollment_count: int = 0
     created_at: datetime
     updated_at: datetime
 
 
 class CourseWithUsers(CourseResponse):
-    """Course response with enrolled users list."""
+    """
+    Course response with one bounded page of its enrollments.
+    Follow `enrollments_next_cursor` for more.
+    """
     enrollments: list[EnrollmentBrief] = []
+    enrollments_next_cursor: str | None = None
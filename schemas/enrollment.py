@@ -1,5 +1,5 @@
 from datetime import datetime
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class EnrollmentBrief(BaseModel):
@@ -10,3 +10,31 @@ class EnrollmentBrief(BaseModel):
     user_id: int
     course_id: int
     enrolled_at: datetime
+
+
+class EnrollmentCreate(BaseModel):
+    """Enroll one user in one course."""
+    user_id: int
+    course_id: int
+
+
+class BulkEnrollment(BaseModel):
+    """Users to enroll in / remove from a course in one statement."""
+    user_ids: list[int] = Field(min_length=1, max_length=10_000)
+
+
+class BulkEnrollmentResult(BaseModel):
+    """Which of the requested users were actually changed."""
+    course_id: int
+    requested: int
+    changed: list[int]
+
+
+class DashboardCourse(BaseModel):
+    """A course on a user's learning dashboard."""
+    model_config = ConfigDict(from_attributes=True)
+
+    course_id: int
+    title: str
+    description: str | None = None
+    enrolled_at: datetime
@@ -0,0 +1,10 @@
+from typing import Generic, TypeVar
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+class CursorPage(BaseModel, Generic[T]):
+    """One page of a keyset-paginated list."""
+    items: list[T]
+    next_cursor: str | None = None
@@ -1,6 +1,8 @@
 from datetime import datetime
 from pydantic import BaseModel, ConfigDict, Field, EmailStr
 
+from schemas.enrollment import EnrollmentBrief
+
 
 # Base schema with common fields
 class UserBase(BaseModel):
@@ -61,3 +63,13 @@ class UserAdmin(BaseModel):
     # is_active: bool
     # is_admin: bool
     # last_login: datetime | None
+
+
+class UserWithEnrollments(UserAdmin):
+    """
+    Admin view plus the enrollment count and one bounded page of
+    enrollments. Follow `enrollments_next_cursor` for more.
+    """
+    enrollment_count: int
+    enrollments: list[EnrollmentBrief] = []
+    enrollments_next_cursor: str | None = None
@@ -0,0 +1,7 @@
+from fastapi.templating import Jinja2Templates
+
+from core.assets import asset_url
+
+# One Jinja environment for every page, so compiled templates are shared
+templates = Jinja2Templates(directory="templates")
+templates.env.globals["asset_url"] = asset_url
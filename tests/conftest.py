@@ -0,0 +1,142 @@
+"""
+Shared fixtures. Every test that takes `engine` or `client` runs once per
+backend: SQLite in a temporary file, and PostgreSQL.
+
+PostgreSQL comes from TEST_POSTGRES_URL (postgresql+asyncpg://...) when it
+is set; otherwise a throwaway server is spawned with initdb/pg_ctl from
+PG_BIN or PATH for the session. Without either, or without asyncpg, the
+PostgreSQL cases are skipped.
+"""
+
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+from pathlib import Path
+
+# The application binds its module-level engines at import; keep them off
+# the working tree's database
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite+aiosqlite:///{tempfile.mkdtemp(prefix='codeatlas-test-')}/app.db",
+)
+
+import httpx
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from database import get_db, get_read_db, make_engine
+from main import app
+from migrations import drop_search_indexes, run_migrations
+from models import Base, Course
+
+BACKENDS = ["sqlite", "postgresql"]
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+# ── PostgreSQL ──
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def postgres_bin() -> Path | None:
+    """Directory holding initdb and pg_ctl, if any."""
+    if os.environ.get("PG_BIN"):
+        return Path(os.environ["PG_BIN"])
+    pg_ctl = shutil.which("pg_ctl")
+    return Path(pg_ctl).parent if pg_ctl else None
+
+
+@pytest.fixture(scope="session")
+def postgres_url(tmp_path_factory):
+    pytest.importorskip("asyncpg", reason="asyncpg is not installed (uv sync --extra postgres)")
+    if os.environ.get("TEST_POSTGRES_URL"):
+        yield os.environ["TEST_POSTGRES_URL"]
+        return
+
+    bindir = postgres_bin()
+    if bindir is None or not (bindir / "initdb").exists():
+        pytest.skip("PostgreSQL not available: set TEST_POSTGRES_URL, or PG_BIN / PATH to its binaries")
+    if os.geteuid() == 0:
+        pytest.skip("initdb refuses to run as root: set TEST_POSTGRES_URL")
+
+    data = tmp_path_factory.mktemp("pgdata")
+    port = free_port()
+    subprocess.run(
+        [bindir / "initdb", "-D", data, "-U", "postgres", "-A", "trust", "-E", "UTF8", "--no-sync"],
+        check=True,
+        capture_output=True,
+    )
+    subprocess.run(
+        [
+            bindir / "pg_ctl", "-D", data, "-l", data / "server.log", "-w",
+            "-o", f"-p {port} -k {data} -c listen_addresses=127.0.0.1 -c fsync=off",
+            "start",
+        ],
+        check=True,
+        capture_output=True,
+    )
+    try:
+        yield f"postgresql+asyncpg://postgres@127.0.0.1:{port}/postgres"
+    finally:
+        subprocess.run([bindir / "pg_ctl", "-D", data, "-m", "immediate", "stop"], capture_output=True)
+
+
+# ── Database ──
+
+@pytest.fixture(params=BACKENDS)
+def database_url(request, tmp_path) -> str:
+    if request.param == "sqlite":
+        return f"sqlite+aiosqlite:///{tmp_path}/test.db"
+    return request.getfixturevalue("postgres_url")
+
+
+async def reset_schema(conn) -> None:
+    await conn.run_sync(drop_search_indexes)
+    await conn.run_sync(Base.metadata.drop_all)
+
+
+@pytest.fixture
+async def engine(database_url):
+    """Writer engine on a freshly migrated schema."""
+    engine = make_engine(database_url)
+    async with engine.begin() as conn:
+        await reset_schema(conn)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(run_migrations)
+        # Start from an empty catalog; tests that want it call seed_catalog
+        await conn.execute(delete(Course))
+    yield engine
+    async with engine.begin() as conn:
+        await reset_schema(conn)
+    await engine.dispose()
+
+
+@pytest.fixture
+def sessions(engine):
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+
+@pytest.fixture
+async def client(sessions):
+    """HTTP client for the app, with its DB dependencies on the test engine."""
+
+    async def get_test_db():
+        async with sessions() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = get_test_db
+    app.dependency_overrides[get_read_db] = get_test_db
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
@@ -0,0 +1,116 @@
+"""SQLAdmin views: the queries and hooks EnrollmentAdmin overrides."""
+
+import pytest
+from sqlalchemy import select
+from starlette.requests import Request
+
+import admin
+from admin import EnrollmentAdmin
+from core.enrollment_counts import reconcile_enrollment_counts
+from core.query_stats import RequestQueries, current_queries, instrument
+from models import Course, Enrollment, User
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def enrollment(sessions):
+    async with sessions() as db:
+        user = User(username="edsger", email="edsger@example.com", hashed_password="x")
+        course = Course(title="Structured Programming")
+        db.add_all([user, course])
+        await db.flush()
+        enrollment = Enrollment(user_id=user.id, course_id=course.id)
+        db.add(enrollment)
+        await db.commit()
+        return enrollment
+
+
+@pytest.fixture
+def view(engine, sessions, monkeypatch):
+    # search_query picks its SQL by the app engine's dialect
+    monkeypatch.setattr(admin, "engine", engine)
+    view = EnrollmentAdmin()
+    view.session_maker = sessions
+    view.is_async = True
+    return view
+
+
+def admin_request(method: str = "POST", query_string: bytes = b"") -> Request:
+    return Request({"type": "http", "method": method, "path": "/admin", "headers": [], "query_string": query_string})
+
+
+async def counts(sessions) -> dict[str, int]:
+    async with sessions() as db:
+        result = await db.execute(select(Course.title, Course.enrollment_count))
+        counts = dict(result.all())
+        # Stored counters agree with the enrollments table
+        assert await reconcile_enrollment_counts(db) == 0
+        return counts
+
+
+async def search(sessions, view, term: str) -> list[int]:
+    async with sessions() as db:
+        result = await db.scalars(view.search_query(select(Enrollment.id), term))
+        return list(result)
+
+
+async def test_search_by_id(sessions, view, enrollment):
+    assert await search(sessions, view, str(enrollment.id)) == [enrollment.id]
+
+
+async def test_search_ignores_ids_out_of_range(sessions, view, enrollment):
+    assert await search(sessions, view, "9" * 30) == []
+
+
+@pytest.mark.parametrize("term", ["²", "①", "١٢"])
+async def test_search_ignores_non_ascii_digits(sessions, view, enrollment, term):
+    assert await search(sessions, view, term) == []
+
+
+@pytest.mark.parametrize("query_string", [b"", b"sortBy=user", b"sortBy=course&sort=desc"])
+async def test_list_page_query_count_is_constant(engine, sessions, view, query_string):
+    async with sessions() as db:
+        courses = [Course(title=f"Course {i}") for i in range(3)]
+        users = [User(username=f"user{i}", email=f"user{i}@example.com", hashed_password="x") for i in range(3)]
+        db.add_all(courses + users)
+        await db.flush()
+        db.add_all(Enrollment(user_id=user.id, course_id=course.id) for user in users for course in courses)
+        await db.commit()
+
+    instrument(engine.sync_engine)
+    queries = RequestQueries()
+    token = current_queries.set(queries)
+    try:
+        page = await view.list(admin_request("GET", query_string))
+    finally:
+        current_queries.reset(token)
+
+    # count, page, then one select-in load each for users and courses
+    assert len(page.rows) == 9
+    assert queries.count == 4
+    assert {row.user.username for row in page.rows} == {user.username for user in users}
+
+
+# ── Enrollment counters ──
+
+async def test_created_enrollment_is_counted(sessions, view):
+    async with sessions() as db:
+        user = User(username="niklaus", email="niklaus@example.com", hashed_password="x")
+        course = Course(title="Algorithms + Data Structures")
+        db.add_all([user, course])
+        await db.commit()
+
+    await view.insert_model(admin_request(), {"user": str(user.id), "course": str(course.id)})
+    assert await counts(sessions) == {course.title: 1}
+
+
+async def test_moved_enrollment_is_recounted(sessions, view, enrollment):
+    async with sessions() as db:
+        course = Course(title="Go To Statement Considered Harmful")
+        db.add(course)
+        await db.commit()
+
+    data = {"user": str(enrollment.user_id), "course": str(course.id)}
+    await view.update_model(admin_request(), str(enrollment.id), data)
+    assert await counts(sessions) == {"Structured Programming": 0, course.title: 1}
@@ -0,0 +1,53 @@
+"""The home page catalog and the courses seeded for it."""
+
+import pytest
+from sqlalchemy import delete, select
+
+import core.catalog
+from core.catalog import invalidate_catalog
+from migrations import CATALOG_COURSES, seed_catalog
+from models import Course
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def catalog_sessions(sessions, monkeypatch):
+    monkeypatch.setattr(core.catalog, "ReadSessionLocal", sessions)
+    invalidate_catalog()
+    yield sessions
+    invalidate_catalog()
+
+
+async def test_home_page_renders_seeded_sections(engine, client, catalog_sessions):
+    async with engine.begin() as conn:
+        await conn.run_sync(seed_catalog)
+
+    response = await client.get("/")
+    assert response.status_code == 200
+    assert "No courses published yet." not in response.text
+    for slug, courses in CATALOG_COURSES.items():
+        assert f'<section class="language-section" id="{slug}">' in response.text
+        assert f'href="#{slug}"' in response.text
+        for title, _ in courses:
+            assert title.replace("&", "&amp;") in response.text
+
+
+async def test_seed_tags_existing_courses_once(engine, sessions):
+    async with sessions() as db:
+        db.add(Course(title="python for beginners", description="Our own"))
+        await db.commit()
+
+    async with engine.begin() as conn:
+        await conn.run_sync(seed_catalog)
+        await conn.execute(delete(Course).where(Course.language == "go"))
+        # Already seeded: the deleted courses stay deleted
+        await conn.run_sync(seed_catalog)
+
+    async with sessions() as db:
+        courses = {course.title: course for course in await db.scalars(select(Course))}
+    assert courses["python for beginners"].language == "python"
+    assert courses["python for beginners"].description == "Our own"
+    assert "Python for Beginners" not in courses
+    assert "Go for Beginners" not in courses
+    assert len(courses) == sum(map(len, CATALOG_COURSES.values())) - len(CATALOG_COURSES["go"])
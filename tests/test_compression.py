@@ -0,0 +1,47 @@
+"""CompressionMiddleware: which responses are compressed."""
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from middleware import CompressionMiddleware
+
+pytestmark = pytest.mark.anyio
+
+PAYLOAD = {"items": ["course"] * 1000}
+
+
+async def plain(request):
+    return JSONResponse(PAYLOAD)
+
+
+async def no_transform(request):
+    return JSONResponse(PAYLOAD, headers={"Cache-Control": "no-transform"})
+
+
+@pytest.fixture
+async def client():
+    app = Starlette(routes=[Route("/plain", plain), Route("/no-transform", no_transform)])
+    transport = httpx.ASGITransport(app=CompressionMiddleware(app, minimum_size=500))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def test_json_is_compressed(client):
+    response = await client.get("/plain", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.json() == PAYLOAD
+
+
+async def test_no_transform_opts_out(client):
+    response = await client.get("/no-transform", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.json() == PAYLOAD
+
+
+async def test_identity_when_not_accepted(client):
+    response = await client.get("/plain", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
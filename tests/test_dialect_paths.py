@@ -0,0 +1,183 @@
+"""
+Endpoints whose SQL differs by dialect: INSERT ... RETURNING, upserts
+through dialect_insert, unique-violation mapping and the search indexes.
+"""
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from core.security import claim_refresh_token
+
+pytestmark = pytest.mark.anyio
+
+
+async def create_user(client, username: str, email: str | None = None) -> dict:
+    response = await client.post("/api/admin/users", json={
+        "username": username,
+        "email": email or f"{username}@example.com",
+        "password": "password123",
+    })
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+async def create_course(client, title: str, description: str = "") -> dict:
+    response = await client.post("/api/admin/courses", json={"title": title, "description": description})
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+async def enrollment_count(client, course_id: int) -> int:
+    response = await client.get(f"/api/admin/courses/{course_id}")
+    return response.json()["enrollment_count"]
+
+
+# ── INSERT ... RETURNING and unique violations ──
+
+async def test_create_user_returns_row(client):
+    user = await create_user(client, "Ada", "Ada@Example.com")
+    assert user["id"] > 0
+    assert user["username"] == "Ada"
+    assert user["email"] == "ada@example.com"
+
+
+async def test_duplicate_username_is_case_insensitive(client):
+    await create_user(client, "grace")
+    response = await client.post("/api/admin/users", json={
+        "username": "GRACE", "email": "other@example.com", "password": "password123",
+    })
+    assert response.status_code == 400
+    assert "Username" in response.json()["detail"]
+
+
+async def test_duplicate_email_is_reported(client):
+    await create_user(client, "linus", "linus@example.com")
+    response = await client.post("/api/admin/users", json={
+        "username": "torvalds", "email": "LINUS@example.com", "password": "password123",
+    })
+    assert response.status_code == 400
+    assert "Email" in response.json()["detail"]
+
+
+# ── Enrollment upserts ──
+
+async def test_enroll_is_idempotent(client):
+    user = await create_user(client, "alan")
+    course = await create_course(client, "Computability")
+    body = {"user_id": user["id"], "course_id": course["id"]}
+
+    first = await client.post("/api/admin/enrollments", json=body)
+    second = await client.post("/api/admin/enrollments", json=body)
+
+    assert first.status_code == 201
+    assert second.status_code == 200
+    assert second.json()["id"] == first.json()["id"]
+    assert await enrollment_count(client, course["id"]) == 1
+
+
+async def test_enroll_unknown_user_is_404(client):
+    course = await create_course(client, "Compilers")
+    response = await client.post("/api/admin/enrollments", json={"user_id": 999, "course_id": course["id"]})
+    assert response.status_code == 404
+    assert await enrollment_count(client, course["id"]) == 0
+
+
+async def test_unenroll_updates_count(client):
+    user = await create_user(client, "barbara")
+    course = await create_course(client, "Abstract Data Types")
+    await client.post("/api/admin/enrollments", json={"user_id": user["id"], "course_id": course["id"]})
+
+    response = await client.delete(f"/api/admin/courses/{course['id']}/enrollments/{user['id']}")
+    assert response.status_code == 204
+    assert await enrollment_count(client, course["id"]) == 0
+
+    response = await client.delete(f"/api/admin/courses/{course['id']}/enrollments/{user['id']}")
+    assert response.status_code == 404
+
+
+async def test_bulk_enroll_skips_unknown_and_existing(client):
+    users = [await create_user(client, f"learner{i}") for i in range(3)]
+    course = await create_course(client, "Databases")
+    await client.post("/api/admin/enrollments", json={"user_id": users[0]["id"], "course_id": course["id"]})
+
+    response = await client.post(
+        f"/api/admin/courses/{course['id']}/enrollments:bulk",
+        json={"user_ids": [user["id"] for user in users] + [999]},
+    )
+    assert response.status_code == 200
+    assert response.json()["changed"] == sorted(user["id"] for user in users[1:])
+    assert await enrollment_count(client, course["id"]) == 3
+
+
+async def test_enrollments_keep_course_updated_at(client):
+    user = await create_user(client, "dennis")
+    course = await create_course(client, "The C Programming Language")
+    body = {"user_id": user["id"], "course_id": course["id"]}
+
+    await client.post("/api/admin/enrollments", json=body)
+    enrolled = (await client.get(f"/api/admin/courses/{course['id']}")).json()
+    await client.delete(f"/api/admin/courses/{course['id']}/enrollments/{user['id']}")
+    unenrolled = (await client.get(f"/api/admin/courses/{course['id']}")).json()
+
+    assert enrolled["enrollment_count"] == 1
+    assert unenrolled["enrollment_count"] == 0
+    assert enrolled["updated_at"] == unenrolled["updated_at"] == course["updated_at"]
+
+
+# ── Bulk inserts ──
+
+async def test_bulk_users_map_ids_to_rows(client):
+    await create_user(client, "taken")
+    rows = [
+        {"username": "first", "email": "first@example.com", "password": "password123"},
+        {"username": "TAKEN", "email": "new@example.com", "password": "password123"},
+        {"username": "second", "email": "second@example.com", "password": "password123"},
+        {"username": "x"},
+    ]
+    response = await client.post("/api/admin/users:bulk", json=rows)
+    report = response.json()
+
+    assert (report["created"], report["duplicates"], report["invalid"]) == (2, 1, 1)
+    for index in (0, 2):
+        user = (await client.get(f"/api/admin/users/{report['results'][index]['id']}")).json()
+        assert user["username"] == rows[index]["username"]
+
+
+async def test_bulk_courses_map_ids_to_rows(client):
+    rows = [{"title": f"Course {i}"} for i in range(5)] + [{"title": "course 0"}]
+    response = await client.post("/api/admin/courses:bulk", json=rows)
+    report = response.json()
+
+    assert (report["created"], report["duplicates"]) == (5, 1)
+    for index in range(5):
+        course = (await client.get(f"/api/admin/courses/{report['results'][index]['id']}")).json()
+        assert course["title"] == rows[index]["title"]
+
+
+# ── Search indexes ──
+
+async def test_course_search_uses_prefix_terms(client):
+    await create_course(client, "Python for Beginners", "Start here")
+    await create_course(client, "Rust in Action", "Systems programming")
+
+    response = await client.get("/api/courses/search", params={"q": "pyth begin"})
+    assert [course["title"] for course in response.json()] == ["Python for Beginners"]
+
+
+async def test_user_search_matches_substrings(client):
+    await create_user(client, "margaret", "hamilton@example.com")
+    await create_user(client, "katherine", "johnson@example.com")
+
+    response = await client.get("/api/admin/users/search", params={"q": "milt"})
+    assert [user["username"] for user in response.json()["items"]] == ["margaret"]
+
+
+# ── Refresh token revocation ──
+
+async def test_refresh_token_can_be_claimed_once(sessions):
+    payload = {"jti": "a" * 32, "exp": (datetime.now(UTC) + timedelta(days=1)).timestamp()}
+    async with sessions() as db:
+        assert await claim_refresh_token(db, payload) is True
+    async with sessions() as db:
+        assert await claim_refresh_token(db, payload) is False
@@ -0,0 +1,46 @@
+"""Streaming export encoders (core.export)."""
+
+import csv
+import io
+import json
+
+import pytest
+
+from core.export import CHUNK_SIZE, encode_csv, encode_json, encode_ndjson
+
+pytestmark = pytest.mark.anyio
+
+COLUMNS = ["id", "title"]
+
+
+async def rows(count: int):
+    for i in range(count):
+        yield (i, f"Course {i}")
+
+
+async def collect(encoder, count: int) -> list[str]:
+    return [chunk async for chunk in encoder(COLUMNS, rows(count))]
+
+
+@pytest.mark.parametrize("encoder", [encode_ndjson, encode_json, encode_csv])
+async def test_rows_are_sent_in_large_chunks(encoder):
+    chunks = await collect(encoder, 20_000)
+    assert 1 < len(chunks) <= 20_000 * 40 // CHUNK_SIZE + 1
+    assert all(len(chunk) >= CHUNK_SIZE for chunk in chunks[:-1])
+
+
+async def test_json_document():
+    assert json.loads("".join(await collect(encode_json, 3))) == [
+        {"id": i, "title": f"Course {i}"} for i in range(3)
+    ]
+    assert json.loads("".join(await collect(encode_json, 0))) == []
+
+
+async def test_ndjson_lines():
+    lines = "".join(await collect(encode_ndjson, 3)).splitlines()
+    assert [json.loads(line) for line in lines] == [{"id": i, "title": f"Course {i}"} for i in range(3)]
+
+
+async def test_csv_rows():
+    reader = csv.reader(io.StringIO("".join(await collect(encode_csv, 2))))
+    assert list(reader) == [COLUMNS, ["0", "Course 0"], ["1", "Course 1"]]
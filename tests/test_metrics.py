@@ -0,0 +1,53 @@
+"""The /metrics scrape endpoint."""
+
+import httpx
+import pytest
+
+from config import settings
+from core.cache import TTLCache
+from main import app
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def client():
+    # /metrics never touches the database
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+async def test_metrics_are_off_by_default(client):
+    assert (await client.get("/metrics")).status_code == 404
+
+
+async def test_metrics_without_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_ENABLED", True)
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert "http_requests_total" in response.text
+
+
+async def test_metrics_token_is_required(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_ENABLED", True)
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "s3cret")
+
+    assert (await client.get("/metrics")).status_code == 401
+    wrong = await client.get("/metrics", headers={"Authorization": "Bearer nope"})
+    assert wrong.status_code == 401
+    right = await client.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+    assert right.status_code == 200
+
+
+async def test_cache_lookups_are_exported(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_ENABLED", True)
+    cache = TTLCache("test", maxsize=1, ttl=60)
+    cache.set("key", "value")
+    cache.get("key")
+    cache.get("key")
+    cache.get("other")
+
+    text = (await client.get("/metrics")).text
+    assert 'cache_lookups_total{cache="test",result="hit"} 2' in text
+    assert 'cache_lookups_total{cache="test",result="miss"} 1' in text
+    assert 'cache_lookups_total{cache="user",result="miss"}' in text
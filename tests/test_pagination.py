@@ -0,0 +1,39 @@
+"""Keyset pagination cursors (core.pagination)."""
+
+import base64
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from core.pagination import MAX_ID, decode_cursor, encode_cursor
+
+
+def raw_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("last_id", [0, 1, MAX_ID])
+def test_cursor_round_trip(last_id):
+    assert decode_cursor(encode_cursor(last_id)) == last_id
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    raw_cursor([1]),
+    raw_cursor({"id": "1"}),
+    raw_cursor({"id": True}),
+    raw_cursor({"id": -1}),
+    raw_cursor({"id": MAX_ID + 1}),
+    raw_cursor({"id": 10**40}),
+])
+def test_invalid_cursor_is_400(cursor):
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor(cursor)
+    assert exc_info.value.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_out_of_range_cursor_is_400_not_500(client):
+    response = await client.get("/api/admin/courses", params={"after": raw_cursor({"id": 2**63})})
+    assert response.status_code == 400
@@ -0,0 +1,47 @@
+"""Per-request SQL statistics (core.query_stats, QueryStatsMiddleware)."""
+
+import pytest
+from sqlalchemy import insert, select, text
+
+from config import settings
+from core.query_stats import RequestQueries, current_queries, instrument
+from models import Course
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def queries(engine):
+    instrument(engine.sync_engine)
+    queries = RequestQueries()
+    token = current_queries.set(queries)
+    yield queries
+    current_queries.reset(token)
+
+
+async def test_repeated_statements_are_reported(engine, queries):
+    async with engine.connect() as conn:
+        for course_id in range(3):
+            await conn.execute(select(Course.title).where(Course.id == course_id))
+
+    assert queries.count == 3
+    assert [count for _, count in queries.repeated(2)] == [3]
+
+
+async def test_executemany_batches_are_not_repeats(engine, queries):
+    async with engine.begin() as conn:
+        for batch in range(3):
+            await conn.execute(insert(Course), [{"title": f"Course {batch}-{i}"} for i in range(2)])
+        await conn.execute(text("SELECT 1"))
+
+    assert queries.count == 4
+    assert queries.repeated(0) == [("SELECT 1", 1)]
+
+
+async def test_server_timing_header_is_opt_in(client, monkeypatch):
+    response = await client.get("/api/courses/top")
+    assert "server-timing" not in response.headers
+
+    monkeypatch.setattr(settings, "SQL_SERVER_TIMING", True)
+    response = await client.get("/api/courses/top")
+    assert response.headers["server-timing"].startswith("db;dur=")
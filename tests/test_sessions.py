@@ -0,0 +1,58 @@
+"""JWT sessions: the access cookie is renewed from the refresh cookie."""
+
+import pytest
+
+import core.catalog
+import middleware
+from config import settings
+from core.cache import user_cache
+from core.security import ACCESS_COOKIE, REFRESH_COOKIE
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def jwt_client(client, sessions, monkeypatch):
+    monkeypatch.setattr(settings, "SESSION_MODE", "jwt")
+    monkeypatch.setattr(middleware, "AsyncSessionLocal", sessions)
+    monkeypatch.setattr(middleware, "ReadSessionLocal", sessions)
+    monkeypatch.setattr(core.catalog, "ReadSessionLocal", sessions)
+    user_cache.clear()
+
+    response = await client.post("/api/admin/users", json={
+        "username": "barbara", "email": "barbara@example.com", "password": "password123",
+    })
+    assert response.status_code == 201
+    response = await client.post("/login", data={"username": "barbara", "password": "password123"})
+    assert response.status_code == 200
+    yield client
+    user_cache.clear()
+
+
+async def test_expired_access_cookie_is_renewed(jwt_client):
+    refresh_token = jwt_client.cookies[REFRESH_COOKIE]
+    # The browser drops the access cookie once its max-age has passed
+    jwt_client.cookies.delete(ACCESS_COOKIE)
+
+    response = await jwt_client.get("/account")
+    assert response.status_code == 200
+    assert "barbara" in response.text
+    assert ACCESS_COOKIE in response.cookies
+    assert response.cookies[REFRESH_COOKIE] != refresh_token
+
+    # The renewed access cookie is used as is on the next request
+    response = await jwt_client.get("/account")
+    assert response.status_code == 200
+    assert "set-cookie" not in response.headers
+
+
+async def test_spent_refresh_cookie_is_not_renewed(jwt_client):
+    refresh_token = jwt_client.cookies[REFRESH_COOKIE]
+    jwt_client.cookies.delete(ACCESS_COOKIE)
+    assert (await jwt_client.post("/refresh")).status_code == 200
+
+    jwt_client.cookies.clear()
+    jwt_client.cookies.set(REFRESH_COOKIE, refresh_token)
+    response = await jwt_client.get("/account")
+    assert response.status_code == 302
+    assert "set-cookie" not in response.headers